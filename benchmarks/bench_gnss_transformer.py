@@ -0,0 +1,133 @@
+'''
+    Benchmark: per-fix cost of gnss_transformer, one JNI call per getter vs. LocationPacker.
+
+    Usage (from the repository root):
+        python -m benchmarks.bench_gnss_transformer [fixes [jni_us]]
+
+    Defaults to 100k fixes. There is no JVM on the desktop, so Location and
+    LocationPacker are Python stand-ins that count the calls crossing into
+    Java. Reports the Python-side cost per fix, JNI crossings per fix and
+    the projected per-fix cost at `jni_us` microseconds per crossing (10 by
+    default, a typical pyjnius method call on a phone), for single fixes
+    and for 60-fix batched deliveries.
+'''
+import sys
+import time
+
+from service.gnss.lib.utils import point as point_utils
+
+
+class Bundle:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def containsKey(self, key):
+        self.calls[0] += 1
+        return True
+
+    def getInt(self, key):
+        self.calls[0] += 1
+        return 8
+
+
+class Location:
+    '''
+        android.location.Location stand-in, every method is one JNI crossing
+    '''
+    def __init__(self, i, calls):
+        self.i     = i
+        self.calls = calls
+
+    def call(self, value):
+        self.calls[0] += 1
+        return value
+
+    def getLatitude(self):  return self.call(48 + self.i * 1e-5)
+    def getLongitude(self): return self.call(17 + self.i * 1e-5)
+    def getAltitude(self):  return self.call(150.0)
+    def getTime(self):      return self.call(1_700_000_000_000 + self.i * 1000)
+    def getSpeed(self):     return self.call(1.5)
+    def getAccuracy(self):  return self.call(3.0)
+    def getBearing(self):   return self.call(90.0)
+    def getProvider(self):  return self.call('gps')
+    def hasAltitude(self):  return self.call(True)
+    def hasSpeed(self):     return self.call(True)
+    def hasAccuracy(self):  return self.call(True)
+    def hasBearing(self):   return self.call(True)
+    def getExtras(self):    return self.call(Bundle(self.calls))
+
+
+class LocationList:
+    '''
+        java.util.List stand-in
+    '''
+    def __init__(self, locations, calls):
+        self.locations = locations
+        self.calls     = calls
+
+    def size(self):
+        self.calls[0] += 1
+        return len(self.locations)
+
+    def get(self, i):
+        self.calls[0] += 1
+        return self.locations[i]
+
+    def toArray(self):
+        self.calls[0] += 1
+        return self.locations
+
+
+class LocationPacker:
+    '''
+        Java helper stand-in, one crossing returning the whole array (Java-side getters are free)
+    '''
+    def __init__(self, calls):
+        self.calls = calls
+
+    @staticmethod
+    def values(loc):
+        return [loc.i * 1e-5 + 48, loc.i * 1e-5 + 17, 150.0, 1_700_000_000_000 + loc.i * 1000, 1.5, 3.0, 90.0, 8.0]
+
+    def pack(self, loc):
+        self.calls[0] += 1
+        return self.values(loc)
+
+    def packList(self, location_list):
+        self.calls[0] += 1
+        return [value for loc in location_list.locations for value in self.values(loc)]
+
+
+def run(name, fixes, batch, packer, jni_us):
+    calls     = [0]
+    locations = [Location(i, calls) for i in range(fixes)]
+    point_utils.LocationPacker = packer(calls) if packer else None
+
+    start = time.perf_counter()
+    if batch == 1:
+        points = [point_utils.gnss_transformer(loc) for loc in locations]
+    else:
+        points = []
+        for i in range(0, fixes, batch):
+            points.extend(point_utils.gnss_transformer_list(LocationList(locations[i:i + batch], calls)))
+    elapsed = time.perf_counter() - start
+
+    python_us = elapsed / fixes * 1e6
+    per_fix   = calls[0] / fixes
+    print \
+    (
+        f'{name:<18} batch {batch:>3}: python {python_us:6.2f} us/fix, '
+        f'{per_fix:5.2f} JNI calls/fix, projected {python_us + per_fix * jni_us:7.2f} us/fix'
+    )
+    return points
+
+
+if __name__ == '__main__':
+    args   = sys.argv[1:]
+    fixes  = int(args[0])   if len(args) > 0 else 100_000
+    jni_us = float(args[1]) if len(args) > 1 else 10
+
+    for batch in (1, 60):
+        getters = run('getters', fixes, batch, None, jni_us)
+        packed  = run('LocationPacker', fixes, batch, LocationPacker, jni_us)
+        assert getters == packed, 'both paths must build the same points'
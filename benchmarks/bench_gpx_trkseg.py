@@ -0,0 +1,115 @@
+'''
+    Benchmark: streaming GPX trackpoint parser vs. the previous regex findall parser.
+
+    Usage (from the repository root):
+        python -m benchmarks.bench_gpx_trkseg [points ...]
+
+    Defaults to 10k, 100k and 1M point files (GPX 1.0 and GPX 1.1).
+'''
+import os
+import re
+import sys
+import time
+import tempfile
+import tracemalloc
+
+from lib.gpx.gpx_stat_parser import iter_gpx_trkseg
+from lib.utils.units         import gpx_time_to_utc_ms
+
+
+def parse_gpx_trkseg_regex(gpx_content, reconstruct = False):
+    '''
+        Previous regex-based parser, kept here as the reference
+    '''
+    pattern = \
+    (
+        r'<trkpt[^>]+lat="([^"]+)"[^>]+lon="([^"]+)"[^>]*>'
+        r'(?:.*?<ele>([^<]+)</ele>)?'
+        r'(?:.*?<time>([^<]+)</time>)?'
+        r'(?:.*?<sat>([^<]+)</sat>)?'
+        r'(?:.*?(?:<speed>([^<]+)</speed>|<gpxtpx:speed>([^<]+)</gpxtpx:speed>))?'
+        r'(?:.*?(?:<custom:accuracy>([^<]+)</custom:accuracy>|<gpxtpx:accuracy>([^<]+)</gpxtpx:accuracy>))?'
+        r'.*?</trkpt>'
+    )
+    matches         = re.findall(pattern, gpx_content)
+    cleaned_matches = [tuple(x for x in t if x != '') for t in matches]
+
+    track_points = []
+    for lat, lon, alt, time_, sat, speed, accuracy in cleaned_matches:
+        if reconstruct:
+            track_points.append \
+            (
+                {
+                    'latitude':               float(lat),
+                    'longitude':              float(lon),
+                    'altitude_m':             float(alt),
+                    'time_ms_utc':            int(gpx_time_to_utc_ms(time_)),
+                    'speed_mps':              float(speed),
+                    'accuracy_m':             float(accuracy),
+                    'satellites_used_in_fix': int(sat)
+                }
+            )
+        else:
+            track_points.append({'lat': float(lat), 'lon': float(lon)})
+    return track_points
+
+
+def write_track(path, points, version):
+    if version == '1.0':
+        ext = '<extensions><custom:accuracy>{acc:.16f}</custom:accuracy></extensions>'
+        spd = '<speed>{spd:.16f}</speed>'
+    else:
+        ext = '<extensions><gpxtpx:speed>{spd:.16f}</gpxtpx:speed><gpxtpx:accuracy>{acc:.16f}</gpxtpx:accuracy></extensions>'
+        spd = ''
+    line = '  <trkpt lat="{lat:.16f}" lon="{lon:.16f}"><ele>{ele:.16f}</ele><time>2026-01-01T00:00:00Z</time><sat>8</sat>' + spd + ext + '</trkpt>\n'
+
+    with open(path, 'w', encoding = 'utf-8') as f:
+        f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<gpx version="{version}">\n<trk>\n <trkseg>\n')
+        for i in range(points):
+            f.write(line.format(lat = 48 + i * 1e-6, lon = 17 + i * 1e-6, ele = 100 + i % 50, spd = 1.5, acc = 3.0))
+        f.write(' </trkseg>\n</trk>\n</gpx>')
+
+
+def measure(func):
+    # Timing run without tracing overhead
+    start   = time.perf_counter()
+    count   = func()
+    elapsed = time.perf_counter() - start
+
+    # Separate run for peak Python memory
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def bench(points, version, reconstruct):
+    path = os.path.join(tempfile.gettempdir(), f'bench_{points}_{version}.gpx')
+    write_track(path, points, version)
+
+    def regex():
+        with open(path, 'r', encoding = 'utf-8') as f:
+            return len(parse_gpx_trkseg_regex(f.read(), reconstruct))
+
+    def streaming():
+        with open(path, 'r', encoding = 'utf-8') as f:
+            return sum(1 for _ in iter_gpx_trkseg(f, reconstruct))
+
+    for name, func in (('regex', regex), ('streaming', streaming)):
+        count, elapsed, peak = measure(func)
+        print \
+        (
+            f'GPX {version} {points:>8} pts reconstruct={reconstruct!s:<5} '
+            f'{name:<9} {elapsed:8.3f} s {count / elapsed:>10.0f} pts/s peak {peak / 2**20:8.1f} MiB'
+        )
+
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    sizes = [int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for points in sizes:
+        for version in ('1.0', '1.1'):
+            for reconstruct in (False, True):
+                bench(points, version, reconstruct)
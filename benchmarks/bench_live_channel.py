@@ -0,0 +1,124 @@
+'''
+    Benchmark: service -> display point handoff, gnss_log.json file vs. the socket channel.
+
+    Usage (from the repository root):
+        python -m benchmarks.bench_live_channel [fixes [interval_ms]]
+
+    Defaults to 100 fixes, one every 50 ms. "file" is the previous path: the
+    service rewrites gnss_log.json (json.dump, indent 2) and the display polls
+    its mtime at FPS and re-reads it. "socket" sends one PointChannel frame per
+    fix to a blocking receiver. Reports the handoff latency and the per-fix
+    cost on the service side.
+'''
+import os
+import sys
+import json
+import time
+import socket
+import tempfile
+import threading
+
+from config                 import FPS
+from lib.utils.pointChannel import PointChannel, point_frame, unpack_point
+
+
+def fix(i):
+    return \
+    {
+        'latitude':               48 + i * 1e-5,
+        'longitude':              17 + i * 1e-5,
+        'altitude_m':             150.0,
+        'time_ms_utc':            1_700_000_000_000 + i * 1000,
+        'speed_mps':              1.5,
+        'accuracy_m':             3.0,
+        'bearing_deg':            90.0,
+        'satellites_used_in_fix': 8,
+        'provider':               'gps'
+    }
+
+
+def summary(name, latencies, send_costs):
+    latencies = sorted(latencies)
+    print \
+    (
+        f'{name:<6} {len(latencies):>5} fixes '
+        f'latency avg {sum(latencies) / len(latencies):7.2f} ms p50 {latencies[len(latencies) // 2]:7.2f} ms '
+        f'max {latencies[-1]:7.2f} ms, service cost {sum(send_costs) / len(send_costs) * 1e6:7.1f} us/fix'
+    )
+
+
+def bench_file(folder, fixes, interval):
+    path = os.path.join(folder, 'gnss_log.json')
+    with open(path, 'w', encoding = 'utf-8') as f:
+        json.dump({}, f)
+
+    sent, latencies, send_costs = {}, [], []
+    done = threading.Event()
+
+    def display():
+        mtime_last = os.path.getmtime(path)
+        while not done.is_set():
+            mtime = os.path.getmtime(path)
+            if mtime != mtime_last:
+                with open(path, 'r', encoding = 'utf-8') as f:
+                    point = json.load(f)
+                latencies.append((time.perf_counter() - sent[point['time_ms_utc']]) * 1000)
+                mtime_last = mtime
+            time.sleep(1 / FPS)
+
+    reader = threading.Thread(target = display)
+    reader.start()
+    for i in range(fixes):
+        point = fix(i)
+        start = time.perf_counter()
+        sent[point['time_ms_utc']] = start
+        with open(path, 'w', encoding = 'utf-8') as f:
+            json.dump(point, f, indent = 2)
+        send_costs.append(time.perf_counter() - start)
+        time.sleep(interval)
+    time.sleep(2 / FPS)
+    done.set()
+    reader.join()
+
+    summary('file', latencies, send_costs)
+    print(f'{"":<6} {fixes - len(latencies)} fixes overwritten before the display read them')
+
+
+def bench_socket(folder, fixes, interval):
+    path   = os.path.join(folder, 'gnss.sock')
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    server.bind(path)
+
+    sent, latencies, send_costs = {}, [], []
+
+    def display():
+        for _ in range(fixes):
+            point, sent_ns = unpack_point(server.recv(point_frame.size))
+            latencies.append((time.perf_counter() - sent[point['time_ms_utc']]) * 1000)
+
+    reader = threading.Thread(target = display)
+    reader.start()
+    channel = PointChannel(path)
+    for i in range(fixes):
+        point = fix(i)
+        start = time.perf_counter()
+        sent[point['time_ms_utc']] = start
+        channel.send(point)
+        send_costs.append(time.perf_counter() - start)
+        time.sleep(interval)
+    reader.join()
+    channel.close()
+    server.close()
+
+    summary('socket', latencies, send_costs)
+
+
+if __name__ == '__main__':
+    args     = [int(n) for n in sys.argv[1:]]
+    fixes    = args[0] if len(args) > 0 else 100
+    interval = (args[1] if len(args) > 1 else 50) / 1000
+
+    folder = tempfile.mkdtemp()
+    bench_file(folder, fixes, interval)
+    if PointChannel.available:
+        bench_socket(folder, fixes, interval)
@@ -0,0 +1,62 @@
+'''
+    Benchmark: recorder trackpoint serialisation (point_to_string) per format.
+
+    Usage (from the repository root):
+        python -m benchmarks.bench_point_format [points]
+
+    Defaults to 200k synthetic fixes. Reports points/s and bytes/point for
+    GPX 1.0, GPX 1.1 and CSV in every precision profile, with every field
+    present (single template call) and with a missing altitude
+    (field-by-field path), plus the CPU share serialisation takes at 10 Hz
+    logging.
+'''
+import sys
+import time
+
+from config import params
+
+from lib.gpx.csvRecorder  import CSVRecorder
+from lib.gpx.gpxRecorder  import GPXRecorder
+from lib.gpx.gpxRecorder1 import GPXRecorder1
+
+
+def fix(i, altitude = True):
+    return \
+    {
+        'latitude':               48 + i * 1e-5,
+        'longitude':              17 + i * 1e-5,
+        'altitude_m':             150.0 + i % 100 / 10 if altitude else None,
+        'time_ms_utc':            1_700_000_000_000 + i * 100,
+        'speed_mps':              1.5,
+        'accuracy_m':             3.0,
+        'bearing_deg':            90.0,
+        'satellites_used_in_fix': 8,
+        'provider':               'gps'
+    }
+
+
+def bench(name, recorder, points, label):
+    size    = 0
+    start   = time.perf_counter()
+    for point in points:
+        size += len(recorder.point_to_string(point))
+    elapsed = time.perf_counter() - start
+
+    rate = len(points) / elapsed
+    print \
+    (
+        f'{name:<8} {label:<24} {rate:>10,.0f} pts/s, {size / len(points):6.1f} B/point, '
+        f'{10 / rate * 100:6.3f} % CPU at 10 Hz'
+    )
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+    complete = [fix(i) for i in range(count)]
+    missing  = [fix(i, altitude = False) for i in range(count)]
+
+    for precision in params['precision']:
+        for name, recorder in (('GPX 1.0', GPXRecorder), ('GPX 1.1', GPXRecorder1), ('CSV', CSVRecorder)):
+            bench(name, recorder(precision = precision), complete, f'{precision}, all fields')
+            bench(name, recorder(precision = precision), missing,  f'{precision}, no altitude')
@@ -0,0 +1,89 @@
+'''
+    Benchmark: rebuilding the tracks index one track at a time vs. the parallel batch.
+
+    Usage (from the repository root):
+        python -m benchmarks.bench_rebuild [tracks [points]]
+
+    Defaults to 1000 tracks of 1000 points. "sequential" is the previous path
+    (index_track per track, one JsonStore put and disk write per track),
+    "parallel" is index_tracks over a process pool plus a single store write.
+'''
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+from kivy.storage.jsonstore import JsonStore
+
+from lib.gpx.gpxRecorder  import GPXRecorder
+from lib.utils.indexer    import index_track, index_tracks
+from lib.utils.saver      import Saver
+from lib.utils.thumbnails import thumbnail_path
+
+
+def write_tracks(folder, tracks, points):
+    for k in range(tracks):
+        recorder = GPXRecorder(output_file = f'track_{k:05}.gpx', work_path = folder)
+        recorder.start_recording()
+        for i in range(points):
+            recorder.add_point \
+            (
+                {
+                    'latitude':               48 + k * 1e-3 + i * 1e-5,
+                    'longitude':              17 + (i % 97) * 1e-5,
+                    'altitude_m':             100 + i % 50,
+                    'time_ms_utc':            1_700_000_000_000 + i * 1000,
+                    'speed_mps':              1.5,
+                    'accuracy_m':             3.0,
+                    'satellites_used_in_fix': 8
+                }
+            )
+        recorder.stop_recording()
+
+
+def bench(tracks, points):
+    root       = tempfile.mkdtemp()
+    folder     = os.path.join(root, 'tracks')
+    thumbnails = os.path.join(root, 'thumbnails')
+    os.makedirs(folder)
+    os.makedirs(thumbnails)
+
+    start = time.perf_counter()
+    write_tracks(folder, tracks, points)
+    print(f'{tracks} tracks x {points} pts written in {time.perf_counter() - start:.1f} s')
+
+    jobs = \
+    {
+        track: (os.path.join(folder, track), thumbnail_path(thumbnails, track))
+        for track in sorted(os.listdir(folder))
+    }
+
+    # Previous path: parse and store one track at a time
+    saver = Saver(storage = JsonStore(os.path.join(root, 'sequential.json')))
+    start = time.perf_counter()
+    for track, paths in jobs.items():
+        saver.instant_save(track.split('.')[0], index_track(*paths))
+    t_sequential = time.perf_counter() - start
+
+    # Parallel parse, single store transaction
+    saver = Saver(storage = JsonStore(os.path.join(root, 'parallel.json')))
+    start = time.perf_counter()
+    results, errors = index_tracks(jobs)
+    t_parse = time.perf_counter() - start
+    saver.bulk_save({track.split('.')[0]: track_data for track, track_data in results.items()})
+    t_parallel = time.perf_counter() - start
+
+    print \
+    (
+        f'sequential {t_sequential:8.2f} s\n'
+        f'parallel   {t_parallel:8.2f} s (parse {t_parse:.2f} s, store {t_parallel - t_parse:.2f} s) '
+        f'{len(results)} indexed, {len(errors)} errors, {os.cpu_count()} cores'
+    )
+
+    shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    args = [int(n) for n in sys.argv[1:]]
+    bench(*(args + [1000, 1000][len(args):]))
@@ -0,0 +1,92 @@
+'''
+    Benchmark: Visvalingam-Whyatt thumbnail simplification vs. the previous stride sampling.
+
+    Usage (from the repository root):
+        python -m benchmarks.bench_simplify [points ...]
+
+    Defaults to 10k, 100k and 1M point synthetic tracks (a winding trail).
+    Reports run time, kept points and the max. deviation of the original
+    track from the thumbnail polyline, in pixels of a 100 px thumbnail.
+'''
+import sys
+import math
+import time
+
+from config           import points_limit, simplify_oversample, simplify_tolerance
+from lib.gpx.simplify import visvalingam
+from lib.gpx.track    import Track
+
+
+def winding_track(points):
+    lat = [48 + 0.05 * math.sin(i / (points / 40)) + 0.01 * math.sin(i / (points / 400)) for i in range(points)]
+    lon = [17 + 0.10 * i / points for i in range(points)]
+    return Track(('lat', 'lon'), {'lat': lat, 'lon': lon})
+
+
+def segment_distance(px, py, ax, ay, bx, by):
+    dx, dy = bx - ax, by - ay
+    if dx == dy == 0:
+        return math.hypot(px - ax, py - ay)
+    t = max(0, min(1, ((px - ax) * dx + (py - ay) * dy) / (dx * dx + dy * dy)))
+    return math.hypot(px - ax - t * dx, py - ay - t * dy)
+
+
+def project(track, bounds, size):
+    '''
+        Flat pixel coordinates using fixed bounds (the original track's)
+    '''
+    min_lat, min_lon, max_lat, max_lon = bounds
+    points = []
+    for lat, lon in zip(track.data['lat'], track.data['lon']):
+        points.append((lon - min_lon) / (max_lon - min_lon) * size)
+        points.append((lat - min_lat) / (max_lat - min_lat) * size)
+    return points
+
+
+def max_deviation(track, thumbnail, size = 100):
+    '''
+        Max. distance (px) of original points from the thumbnail polyline, sampled
+    '''
+    bounds   = track.bounds()
+    original = project(track, bounds, size)
+    line     = project(thumbnail, bounds, size)
+    segments = list(zip(line[0::2], line[1::2]))
+    worst    = 0
+    j        = 0
+    for k in range(0, len(original), 2 * max(1, len(original) // 20000)):
+        px, py = original[k], original[k + 1]
+        while j < len(segments) - 2 and segments[j + 1][0] < px:
+            j += 1
+        ax, ay = segments[j]
+        bx, by = segments[min(j + 1, len(segments) - 1)]
+        worst  = max(worst, segment_distance(px, py, ax, ay, bx, by))
+    return worst
+
+
+def bench(points):
+    track = winding_track(points)
+
+    start  = time.perf_counter()
+    stride = track[::max(1, points // points_limit)]
+    t_stride = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full  = visvalingam(track, points_limit, simplify_tolerance)
+    t_full = time.perf_counter() - start
+
+    start = time.perf_counter()
+    over  = visvalingam(track[::max(1, points // (points_limit * simplify_oversample))], points_limit, simplify_tolerance)
+    t_over = time.perf_counter() - start
+
+    for name, thumbnail, elapsed in (('stride', stride, t_stride), ('vw', full, t_full), ('vw oversampled', over, t_over)):
+        print \
+        (
+            f'{points:>8} pts {name:<15} {elapsed:8.3f} s {len(thumbnail):>6} kept '
+            f'max dev {max_deviation(track, thumbnail):6.2f} px'
+        )
+
+
+if __name__ == '__main__':
+    sizes = [int(n) for n in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for points in sizes:
+        bench(points)
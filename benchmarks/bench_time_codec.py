@@ -0,0 +1,53 @@
+'''
+    Benchmark: GPX timestamp codec, datetime strftime/strptime vs. lib.utils.units.
+
+    Usage (from the repository root):
+        python -m benchmarks.bench_time_codec [timestamps [interval_ms]]
+
+    Defaults to 1M timestamps one second apart (a 1 Hz track of ~11.5
+    days). Encodes them with the previous datetime.strftime path and with
+    utc_ms_to_gpx_time (seconds and milliseconds), then decodes the text
+    with datetime.strptime and with gpx_time_to_utc_ms, checking that both
+    sides agree.
+'''
+import sys
+import time
+
+from datetime import datetime, timezone
+
+from lib.utils.units import utc_ms_to_gpx_time, gpx_time_to_utc_ms
+
+
+def strftime_encode(time_ms_utc, format = '%Y-%m-%dT%H:%M:%SZ'):
+    return datetime.fromtimestamp(time_ms_utc / 1000, tz = timezone.utc).strftime(format)
+
+def strptime_decode(dt_str, format = '%Y-%m-%dT%H:%M:%SZ'):
+    return int(datetime.strptime(dt_str, format).replace(tzinfo = timezone.utc).timestamp() * 1000)
+
+
+def timed(name, function, values, baseline = None):
+    start   = time.perf_counter()
+    results = [function(value) for value in values]
+    elapsed = time.perf_counter() - start
+
+    speedup = f', {baseline / elapsed:5.1f}x' if baseline else ''
+    print(f'{name:<28} {elapsed:7.3f} s, {elapsed / len(values) * 1e9:7.0f} ns/timestamp{speedup}')
+    return results, elapsed
+
+
+if __name__ == '__main__':
+    args     = [int(n) for n in sys.argv[1:]]
+    count    = args[0] if len(args) > 0 else 1_000_000
+    interval = args[1] if len(args) > 1 else 1000
+
+    stamps = [1_700_000_000_000 + i * interval for i in range(count)]
+
+    print(f'{count} timestamps, {interval} ms apart')
+    texts,   baseline = timed('encode strftime', strftime_encode, stamps)
+    fast,    _        = timed('encode utc_ms_to_gpx_time', utc_ms_to_gpx_time, stamps, baseline)
+    timed('encode milliseconds', lambda t: utc_ms_to_gpx_time(t, True), stamps, baseline)
+    assert texts == fast
+
+    parsed,  baseline = timed('decode strptime', strptime_decode, texts)
+    decoded, _        = timed('decode gpx_time_to_utc_ms', gpx_time_to_utc_ms, texts, baseline)
+    assert parsed == decoded == [t // 1000 * 1000 for t in stamps]
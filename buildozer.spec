@@ -23,6 +23,7 @@ source.include_exts = py, png, jpg, kv, atlas, txt
 
 # (list) List of directory to exclude (let empty to not exclude anything)
 #source.exclude_dirs = tests, bin, venv
+source.exclude_dirs = benchmarks, tests
 
 # (list) List of exclusions using pattern matching
 # Do not prefix with './'
@@ -45,7 +46,8 @@ requirements =
     androidstorage4kivy==0.1.1,
     pyjnius==1.7.0,
     android==2024.1.21,
-    filetype==1.2.0
+    filetype==1.2.0,
+    sqlite3
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
@@ -194,6 +196,7 @@ android.accept_sdk_license = True
 # (list) List of Java files to add to the android project (can be java or a
 # directory containing the files)
 #android.add_src =
+android.add_src = service/gnss/java
 
 # (list) Android AAR archives to add
 #android.add_aars =
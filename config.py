@@ -23,7 +23,13 @@ params = \
 	'screen':   ['always on', 'timeout'],
 	'theme':    {'dark': 'red', 'light': 'blue'},
 	'units':    ['metric', 'imperial'],
-	'format':   ['GPX 1.0', 'GPX 1.1', 'CSV']
+	'format':   ['GPX 1.0', 'GPX 1.1', 'CSV'],
+	'batching': {'off': 0, '1 min': 60, '5 min': 300},  # max. fix delivery delay in s (API 31+)
+	'precision':  # decimals written per field
+	{
+		'compact': {'latitude': 7,  'longitude': 7,  'altitude_m': 1,  'speed_mps': 2,  'accuracy_m': 1},
+		'full':    {'latitude': 16, 'longitude': 16, 'altitude_m': 16, 'speed_mps': 16, 'accuracy_m': 16}
+	}
 }
 
 default_settings = \
@@ -35,7 +41,9 @@ default_settings = \
 	'screen':       {'value': 'always on'},
 	'theme':        {'value': 'dark'},
 	'units':        {'value': 'metric'},
-	'format':       {'value': 'GPX 1.0'}
+	'format':       {'value': 'GPX 1.0'},
+	'batching':     {'value': 'off'},
+	'precision':    {'value': 'compact'}
 }
 
 # Package and generated service class
@@ -53,3 +61,42 @@ FPS = 10
 
 # Track thumbnail
 points_limit = 1200
+
+# Thumbnail simplification (points read = points_limit * oversample, tolerance as a fraction of the thumbnail size)
+simplify_oversample = 8
+simplify_tolerance  = 0.005
+
+# Recorder commit policy (max. points / seconds lost if the service is killed)
+commit_points  = 10
+commit_seconds = 10
+commit_fsync   = False
+
+# Recorded timestamps (True: YYYY-MM-DDTHH:MM:SS.sssZ, keeps sub-second fixes apart)
+time_milliseconds = False
+
+# Final file generation (temporary body copy chunk in characters)
+copy_chunk_size = 64 * 1024
+
+# Finished track compression (gzip level 1-9 writes .gpx.gz / .csv.gz, 0 writes plain files)
+track_compression = 0
+
+# Track parsing (streaming read chunk in characters)
+parse_chunk_size = 64 * 1024
+
+# Track indexing (background parser threads)
+index_workers = 2
+rebuild_workers   = None  # None: one process per core
+rebuild_threshold = 32    # new tracks from which synchronize rebuilds the whole index
+
+# Track catalogue (rows read per query page)
+show_page_size = 100
+
+# Settings push channel (UNIX datagram socket next to settings.json, polling at FPS as fallback)
+settings_socket_ext = '.sock'
+settings_timeout    = 10  # max. seconds the service sleeps between settings checks
+
+# Recent fixes kept in the shared ring buffer (80 B each)
+ring_size = 10_000
+
+# Location delivery measurement (seconds between deliveries-per-hour reports, 0 disables)
+delivery_report = 600
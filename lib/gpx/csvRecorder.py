@@ -1,6 +1,6 @@
 import os
 
-from lib.gpx.csv_stat_parser import parse_csv_dict
+from lib.gpx.csv_stat_parser import iter_csv_dict, csv_columns
 from lib.gpx.gpxRecorder     import GPXRecorder
 
 from lib.utils.units import \
@@ -15,7 +15,21 @@ from lib.utils.units import \
 
 
 class CSVRecorder(GPXRecorder):
+    # Columns in csv_columns order
+    point_fields = \
+    (
+        'latitude',
+        'longitude',
+        'altitude_m',
+        'time_ms_utc',
+        'speed_mps',
+        'satellites_used_in_fix',
+        'accuracy_m'
+    )
+    point_template = '{},{},{},{},{},{},{}'
+
     def __init__(self, *args, **kwargs):
+        kwargs.setdefault('indent', '')
         super().__init__(*args, **kwargs)
 
         # Ensure output file has .csv extension
@@ -32,80 +46,31 @@ class CSVRecorder(GPXRecorder):
         self._temp_filename = f'{self.track_name}.csv_{self.units}'
         self.temp_file_path = os.path.join(self.work_path, self._temp_filename)
 
-    def point_to_string(self, point):
-        '''
-            Convert point to CSV string for temporary working
-        '''
-
-        # Latitude and longitude in decimal degrees
-        csv_parts = []
-        if point.get('latitude') is not None and point.get('longitude') is not None:
-            csv_parts.append(f"{point.get('latitude'):.16f}")
-            csv_parts.append(f"{point.get('longitude'):.16f}")
-        else:
-            csv_parts.append(' ')
-            csv_parts.append(' ')
-
-        # Altitude in meters
-        if point.get('altitude_m') is not None:
-            csv_parts.append(f"{point.get('altitude_m'):.16f}")
-        else:
-            csv_parts.append(' ')
-
-        # UTC time in YYYY-MM-DDTHH:MM:SSZ
-        if point.get('time_ms_utc') is not None:
-            time_gpx = utc_ms_to_gpx_time(point.get('time_ms_utc'))
-        else:
-            time_gpx = utc_ms_to_gpx_time(utc_ms_time())
-        csv_parts.append(time_gpx)
-
-        # Speed in m/s
-        if point.get('speed_mps') is not None:
-            csv_parts.append(f"{point.get('speed_mps'):.16f}")
-        else:
-            csv_parts.append(' ')
-
-        # Number of sattelites used in fix
-        if point.get('satellites_used_in_fix') is not None:
-            csv_parts.append(str(point.get('satellites_used_in_fix')))
-        else:
-            csv_parts.append(' ')
-
-        # Accuracy in meters
-        if point.get('accuracy_m') is not None:
-            csv_parts.append(f"{point.get('accuracy_m'):.16f}")
-        else:
-            csv_parts.append(' ')
-
-        return ','.join(csv_parts)
-
     def generate_final_file(self, reconstruct = False):
         '''
             Generate the final CSV file with all recorded points
         '''
-        # Reconstruct lines
-        lines = self.reconstruct_file(parse_csv_dict, reconstruct)
-
-        # Clean up temporary file
-        os.remove(self.temp_file_path)
-        print('[GPX]', f'Temporary file {self._temp_filename} deleted')
+        # Reconstruct statistics
+        self.reconstruct_file(iter_csv_dict, reconstruct)
 
         # Create and write to final CSV file
-        output_file_path = os.path.join(self.work_path, self._output_file)
-        with open(output_file_path, 'x', encoding = 'utf-8', newline = '') as f:
+        with self.final_open(newline = '') as f:
             # Write header comments
             self._create_csv_header(f)
 
             # Write CSV column headers
             f.write('#\n')  # Empty comment line for separation
-            f.write('lat,lon,ele,time,speed,sat,accuracy\n')
+            f.write(f"{','.join(csv_columns)}\n")
+
+            # Add all points from temporary file
+            self.copy_temp_body(f)
+
+        print('[GPX]', f'Final file {self.final_file} created')
 
-            # Read and add all points from temporary file
-            for line in lines:
-                line = line.strip()
-                if line:
-                    f.write(f'{line}\n')
-        print('[GPX]', f'Final file {self._output_file} created')
+        # Clean up temporary file
+        os.remove(self.temp_file_path)
+        self.checkpoint_remove()
+        print('[GPX]', f'Temporary file {self._temp_filename} deleted')
 
     def _create_csv_header(self, file_handle):
         '''
@@ -127,8 +92,8 @@ class CSVRecorder(GPXRecorder):
 
         # Add bounds if available
         if self.points_count > 0:
-            file_handle.write(f'# Bounds: {self.min_lat:.16f}, {self.min_lon:.16f} to {self.max_lat:.16f},{self.max_lon:.16f}\n')
+            file_handle.write(f'# Bounds: {self.min_lat:{self.bounds_spec}}, {self.min_lon:{self.bounds_spec}} to {self.max_lat:{self.bounds_spec}},{self.max_lon:{self.bounds_spec}}\n')
 
         # Add track name and timing info
         file_handle.write(f'# Track Name = {self.track_name}\n')
-        file_handle.write(f'# Start Time = {utc_ms_to_gpx_time(self.start_time)}\n')
+        file_handle.write(f'# Start Time = {utc_ms_to_gpx_time(self.start_time, self.milliseconds)}\n')
@@ -1,108 +1,109 @@
-import re
 import io
 import csv
+import itertools
 
-from lib.utils.units import gpx_time_to_utc_ms
+from lib.gpx.gpx_stat_parser import parse_statistics_comments
+from lib.gpx.track           import Track
+from lib.utils.units         import gpx_time_to_utc_ms, parse_number
+
+
+# Column order written by CSVRecorder
+csv_columns = ['lat', 'lon', 'ele', 'time', 'speed', 'sat', 'accuracy']
+
+
+def read_csv_statistics(file):
+    '''
+        Parse statistics from the CSV comment header only - reading stops at the
+        first non-comment line (the column line), so the track body is never loaded.
+    '''
+    comments = []
+    for line in file:
+        if not line.startswith('#'):
+            break
+        comments.append(line[1:].strip())
+
+    return parse_statistics_comments(comments, float)
 
 
 def parse_all_csv_statistics(csv_content):
     '''
         Parse all statistics from CSV header comments including elevation changes and units.
     '''
-    statistics = {}
+    return read_csv_statistics(io.StringIO(csv_content))
 
-    # Define patterns for each statistic (adapted for CSV comment format)
-    patterns = \
-    {
-        'units': r'# Units = (\w+)',
-        'track_points': r'# Track = (\d+) TrackPoints',
-        'distance': r'# Distance = ([\d.]+)\s*(\w+)?',
-        'duration': r'# Duration = ([\d:]+)',
-        'elevation_gain': r'# Elevation Gain = ([\d.]+)\s*(\w+)?',
-        'elevation_loss': r'# Elevation Loss = ([\d.]+)\s*(\w+)?',
-        'speed_max': r'# Max Speed = ([\d.]+)\s*([\w/]+)?',
-        'speed_avg': r'# Avg Speed = ([\d.]+)\s*([\w/]+)?',
-    }
 
-    # Extract each statistic
-    for key, pattern in patterns.items():
-        match = re.search(pattern, csv_content)
-        if match:
-            value = match.group(1)
-
-            if key in ['distance', 'elevation_gain', 'elevation_loss', 'speed_max', 'speed_avg']:
-                # Convert to float and store with unit
-                statistics[key] = \
-                {
-                    'value': float(value),
-                    'unit': match.group(2) if len(match.groups()) > 1 and match.group(2) else None
-                }
-
-            elif key == 'track_points':
-                statistics[key] = \
-                {
-                    'value': int(value),
-                    'unit': 'points'
-                }
-
-            else:
-                statistics[key] = \
-                {
-                    'value': value
-                }
-
-    # Calculate net elevation change
-    if 'elevation_gain' in statistics and 'elevation_loss' in statistics:
-        net_change = statistics['elevation_gain']['value'] - statistics['elevation_loss']['value']
-        statistics['net_elevation_change'] = \
+def csv_point(c, reconstruct = False):
+    '''
+        Convert a single CSV row (dict by column) into a point dict.
+    '''
+    if not reconstruct:
+        return \
         {
-            'value': net_change,
-            'unit': statistics['elevation_gain']['unit']
+            'lat': parse_number(c['lat']),
+            'lon': parse_number(c['lon'])
         }
 
-    return statistics
+    time = c['time'].strip() if c['time'] else None
+    return \
+    {
+        'latitude':               parse_number(c['lat']),
+        'longitude':              parse_number(c['lon']),
+        'altitude_m':             parse_number(c['ele']),
+        'time_ms_utc':            gpx_time_to_utc_ms(time) if time else None,
+        'speed_mps':              parse_number(c['speed']),
+        'accuracy_m':             parse_number(c['accuracy']),
+        'satellites_used_in_fix': parse_number(c['sat'], int)
+    }
 
 
-def parse_csv_dict(csv_content, reconstruct = False):
+def iter_csv_dict(file, reconstruct = False):
     '''
-        Parse CSV track segments and extract lat/lon (or full GPXPoint if requested).
+        Lazily yield track points from a CSV file object (final or temporary file).
+        A final row that fails to parse is skipped, a crash can tear the last write.
     '''
-    # Split into lines and strip
-    lines = [line.strip() for line in csv_content.splitlines() if line.strip()]
-
-    # Case 1: If first non-comment line starts with "#"
-    if lines[0].startswith('#'):
-        # Drop comments
-        lines = [line for line in lines if not line.startswith('#')]
-        # Build CSV reader with header
-        reader = csv.DictReader(io.StringIO('\n'.join(lines)), skipinitialspace = True)
+    # Drop comments and blank lines
+    rows  = (line for line in file if line.strip() and not line.startswith('#'))
+    first = next(rows, None)
+    if first is None:
+        return
 
-    # Case 2: No header → add one manually
+    # Column line present in final files, temporary files start with data
+    if first.startswith('lat,'):
+        fieldnames = [name.strip() for name in first.split(',')]
     else:
-        header = 'lat,lon,ele,time,speed,sat,accuracy'
-        reader = csv.DictReader(io.StringIO(header + '\n' + '\n'.join(lines)), skipinitialspace = True)
-
-    points = []
-    for c in reader:
-        if reconstruct:
-            points.append \
-            (
-                {
-                    'latitude':                            float(c['lat']) if c['lat']      is not None else None,
-                    'longitude':                           float(c['lon']) if c['lon']      is not None else None,
-                    'altitude_m':                          float(c['ele']) if c['ele']      is not None else None,
-                    'time_ms_utc': int(gpx_time_to_utc_ms(str(c['time']))) if c['time']     is not None else None,
-                    'speed_mps':                         float(c['speed']) if c['speed']    is not None else None,
-                    'accuracy_m':                     float(c['accuracy']) if c['accuracy'] is not None else None,
-                    'satellites_used_in_fix':                int(c['sat']) if c['sat']      is not None else None
-                }
-            )
+        fieldnames = csv_columns
+        rows       = itertools.chain([first], rows)
+
+    # One row of lookahead tells the final row apart
+    reader = csv.DictReader(rows, fieldnames = fieldnames, skipinitialspace = True)
+    row    = next(reader, None)
+    while row is not None:
+        row_next = next(reader, None)
+        if row_next is None:
+            # A crash can cut the final row anywhere: it needs every column and a time
+            if None in row.values() or not (row.get('time') or '').strip():
+                return
+            try:
+                point = csv_point(row, reconstruct)
+            except ValueError:
+                return
         else:
-            points.append \
-            (
-                {
-                    'lat': float(c['lat']),
-                    'lon': float(c['lon'])
-                }
-            )
-    return points
+            point = csv_point(row, reconstruct)
+
+        yield point
+        row = row_next
+
+
+def read_csv_track(file, step = 1, columns = ('lat', 'lon')):
+    '''
+        Read every `step`-th point of a CSV file object into a columnar Track.
+    '''
+    reconstruct = columns != ('lat', 'lon')
+    return Track.from_points(itertools.islice(iter_csv_dict(file, reconstruct), 0, None, step), columns)
+
+
+def parse_csv_dict(csv_content, reconstruct = False):
+    '''
+        Parse CSV track segments from a string and extract lat/lon (or full GPXPoint if requested).
+    '''
+    return list(iter_csv_dict(io.StringIO(csv_content), reconstruct))
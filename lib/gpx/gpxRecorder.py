@@ -1,11 +1,17 @@
+import io
 import os
+import gzip
+import json
+import shutil
 
 from math  import sin, cos, radians, atan2, sqrt
 
-from lib.gpx.gpx_stat_parser import parse_gpx_trkseg
+from lib.gpx.gpx_stat_parser import iter_gpx_trkseg
+from lib.gpx.pointWriter     import PointWriter
+from lib.gpx.point_format    import compile_point_format
 
-from config import app_name, urls
-from lib.utils.paths    import working_path
+from config import app_name, urls, commit_points, commit_seconds, copy_chunk_size, time_milliseconds, params, default_settings, track_compression
+from lib.utils.paths    import working_path, checkpoint_ext, compressed_ext
 from lib.utils.units    import \
 (
     utc_ms_to_gpx_time,
@@ -21,6 +27,33 @@ class GPXRecorder:
     '''
         Streaming GPX recorder that writes points in real-time
     '''
+    # Trackpoint: point key per slot of point_template, latitude and longitude first.
+    # Float fields take their decimals from the precision profile, the rest are written as is.
+    point_fields = \
+    (
+        'latitude',
+        'longitude',
+        'altitude_m',
+        'time_ms_utc',
+        'satellites_used_in_fix',
+        'speed_mps',
+        'accuracy_m'
+    )
+    point_template = \
+    (
+        '<trkpt lat="{}" lon="{}"><ele>{}</ele><time>{}</time><sat>{}</sat><speed>{}</speed>'
+        '<extensions><custom:accuracy>{}</custom:accuracy></extensions></trkpt>'
+    )
+
+    # Running statistics saved in the checkpoint next to the temporary file
+    checkpoint_fields = \
+    (
+        'total_distance', 'speed_max', 'speed_avg', 'speed_sum', 'speed_count',
+        'elevation_gain', 'elevation_loss', 'total_duration', 'duration_format',
+        'min_lat', 'max_lat', 'min_lon', 'max_lon',
+        'last_point', 'last_elevation', 'points_count', 'start_time'
+    )
+
     def __init__ \
         (
             self,
@@ -29,7 +62,15 @@ class GPXRecorder:
             activity:    str = None,
             work_path:   str = working_path,
             units:       str = 'metric',
-            link:        str = urls['web']
+            link:        str = urls['web'],
+            indent:      str = '  ',
+
+            commit_points:  int   = commit_points,
+            commit_seconds: float = commit_seconds,
+
+            milliseconds: bool = time_milliseconds,
+            precision:    str  = default_settings['precision']['value'],
+            compression:  int  = track_compression
         ):
         self.__output_file = output_file
 
@@ -38,6 +79,27 @@ class GPXRecorder:
         self.work_path = work_path
         self.units     = units
         self.link      = link
+        self.indent    = indent
+
+        # Timestamp and number precision
+        self.milliseconds = milliseconds
+        self.precision    = params['precision'].get(precision, params['precision'][default_settings['precision']['value']])
+        self.bounds_spec  = f".{self.precision['latitude']}f"
+
+        # Trackpoint serialiser, compiled once per format and precision
+        self.point_time   = self.point_fields.index('time_ms_utc')
+        self.point_format = compile_point_format \
+        (
+            self.point_template,
+            tuple(f'.{self.precision[key]}f' if key in self.precision else '' for key in self.point_fields)
+        )
+
+        # Finished track gzip level (0: plain file)
+        self.compression = compression
+
+        # Commit policy
+        self.commit_points  = commit_points
+        self.commit_seconds = commit_seconds
 
         # Statistics tracking
         self.stats_reset()
@@ -106,7 +168,7 @@ class GPXRecorder:
 
             # Create temporary file for storing points in working directory
             self.temp_init()
-            self.temp_points_file = open(self.temp_file_path, 'w')
+            self.temp_points_file = self.writer_open('w')
 
             print('[GPX]', f'Started recording to {self._output_file}')
             print('[GPX]', f'Track:               {self.track_name}')
@@ -120,7 +182,7 @@ class GPXRecorder:
                 raise RuntimeError('[GPX] No active temporary file')
 
             self.is_recording = 1
-            self.temp_points_file = open(self.temp_file_path, 'a')
+            self.temp_points_file = self.writer_open('a')
 
             print('[GPX]', f'Resumed recording to {self._output_file}')
             print('[GPX]', f'Track:               {self.track_name}')
@@ -132,7 +194,7 @@ class GPXRecorder:
         if self.is_recording == 1:
             self.is_recording = -1
 
-            # Close temporary file
+            # Commit pending points and close temporary file
             self.temp_points_file.close()
 
             print('[GPX]', f'Recording paused. Duration: {self.total_duration:.0f} s')
@@ -146,7 +208,7 @@ class GPXRecorder:
         if self.is_recording != 0:
             self.is_recording = 0
 
-            # Close temporary file
+            # Commit pending points and close temporary file
             self.temp_points_file.close()
 
             # Generate final file
@@ -155,7 +217,7 @@ class GPXRecorder:
             print('[GPX]', f'Recording stopped. Duration: {self.total_duration:.0f} s')
             print('[GPX]', f'Total points: {self.points_count}')
             print('[GPX]', f'Distance: {self.total_distance:.0f} m')
-            print('[GPX]', f'Final GPX saved to: {self._output_file}')
+            print('[GPX]', f'Final GPX saved to: {self.final_file}')
 
             # Stats reset
             self.stats_reset()
@@ -166,13 +228,85 @@ class GPXRecorder:
         '''
             Add a GPS point to the recording
         '''
-        # Update statistics
-        self.update_statistics(point)
+        self.add_points([point])
+
+    def add_points(self, points):
+        '''
+            Add a batch of GPS points in order (batched location deliveries).
+            Lines are queued in one writer call, so a commit never splits the
+            batch and the checkpoint statistics match the committed bytes.
+        '''
+        lines = []
+        for point in points:
+            self.update_statistics(point)
+            lines.append(f'{self.indent}{self.point_to_string(point)}\n')
+
+        self.temp_points_file.write_many(lines)
+
+    def writer_open(self, mode):
+        '''
+            Open the temporary file through a group-committing writer
+        '''
+        return PointWriter \
+        (
+            self.temp_file_path,
+            mode,
+            commit_points  = self.commit_points,
+            commit_seconds = self.commit_seconds,
+            on_commit      = self.checkpoint_save
+        )
+
+    @property
+    def checkpoint_path(self):
+        return f'{self.temp_file_path}{checkpoint_ext}'
+
+    def checkpoint_save(self, offset):
+        '''
+            Atomically save running statistics matching `offset` committed bytes
+        '''
+        try:
+            checkpoint = {field: getattr(self, field) for field in self.checkpoint_fields}
+            checkpoint['offset'] = offset
+
+            checkpoint_temp = f'{self.checkpoint_path}.tmp'
+            with open(checkpoint_temp, 'w', encoding = 'utf-8') as f:
+                json.dump(checkpoint, f)
+            os.replace(checkpoint_temp, self.checkpoint_path)
+
+        except Exception as e:
+            print('[GPX]', f'Checkpoint not saved: {e}')
+
+    def checkpoint_load(self):
+        '''
+            Restore running statistics from the checkpoint, return byte offset to replay from
+        '''
+        try:
+            with open(self.checkpoint_path, 'r', encoding = 'utf-8') as f:
+                checkpoint = json.load(f)
+
+            offset = int(checkpoint['offset'])
+            if offset > os.path.getsize(self.temp_file_path):
+                raise ValueError('offset beyond the temporary file')
+
+            for field in self.checkpoint_fields:
+                setattr(self, field, checkpoint[field])
 
-        # Write point to temporary file
-        point_xml = self.point_to_string(point)
-        self.temp_points_file.write(f'{point_xml} \n')
-        self.temp_points_file.flush()
+            print('[GPX]', f'Checkpoint restored: {self.points_count} points, offset {offset} B')
+            return offset
+
+        except FileNotFoundError:
+            return 0
+
+        except Exception as e:
+            print('[GPX]', f'Checkpoint ignored, full replay: {e}')
+            self.stats_reset()
+            self.points_count = 0
+            self.start_time   = None
+            return 0
+
+    def checkpoint_remove(self):
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
 
     def update_statistics(self, point):
         '''
@@ -248,114 +382,91 @@ class GPXRecorder:
 
     def point_to_string(self, point):
         '''
-            Convert point to XML string for temporary working
+            Convert point to a trackpoint line for temporary working (point_template of the format)
         '''
+        values = list(map(point.get, self.point_fields))
 
-        # Latitude and longitude in decimal degrees
-        xml_parts = []
-        if point.get('latitude') is not None and point.get('longitude') is not None:
-            xml_parts.append(f'''<trkpt lat="{point.get('latitude'):.16f}" lon="{point.get('longitude'):.16f}">''')
-        else:
-            xml_parts.append(f'<trkpt lat=" " lon=" ">')
-
-        # Altitude in meters
-        if point.get('altitude_m') is not None:
-            xml_parts.append(f"<ele>{point.get('altitude_m'):.16f}</ele>")
-        else:
-            xml_parts.append(f'<ele> </ele>')
-
-        # UTC time in YYYY-MM-DDTHH:MM:SSZ
-        if point.get('time_ms_utc') is not None:
-            time_gpx = utc_ms_to_gpx_time(point.get('time_ms_utc'))
-        else:
-            time_gpx = utc_ms_to_gpx_time(utc_ms_time())
-        xml_parts.append(f'<time>{time_gpx}</time>')
-
-        # Number of sattelites used in fix
-        if point.get('satellites_used_in_fix') is not None:
-            xml_parts.append(f"<sat>{point.get('satellites_used_in_fix')}</sat>")
-        else:
-            xml_parts.append(f'<sat> </sat>')
-
-        # Speed in m/s
-        if point.get('speed_mps') is not None:
-            xml_parts.append(f"<speed>{point.get('speed_mps'):.16f}</speed>")
-        else:
-            xml_parts.append(f'<speed> </speed>')
-
-        # GPX 1.0 uses extensions for custom fields like accuracy
-        extensions = []
-        # Accuracy in meters
-        if point.get('accuracy_m') is not None:
-            extensions.append(f"<custom:accuracy>{point.get('accuracy_m'):.16f}</custom:accuracy>")
-        else:
-            extensions.append(f'<custom:accuracy> </custom:accuracy>')
+        # UTC time in YYYY-MM-DDTHH:MM:SSZ (YYYY-MM-DDTHH:MM:SS.sssZ with milliseconds)
+        time_ms_utc             = values[self.point_time]
+        values[self.point_time] = utc_ms_to_gpx_time(utc_ms_time() if time_ms_utc is None else time_ms_utc, self.milliseconds)
 
-        if extensions:
-            xml_parts.append('<extensions>')
-            xml_parts.extend(extensions)
-            xml_parts.append('</extensions>')
+        # Latitude and longitude are written as a pair or not at all
+        if values[0] is None or values[1] is None:
+            values[0] = values[1] = None
 
-        xml_parts.append('</trkpt>')
-        return ''.join(xml_parts)
+        return self.point_format(values)
 
     def reconstruct_file(self, func, reconstruct = False):
+        '''
+            Rebuild recording statistics from the temporary file (crash recovery)
+        '''
         if reconstruct:
             self.temp_init()
 
-            # Open temporary file
-            with open(self.temp_file_path, 'r', encoding = 'utf-8') as f:
-                points = f.read()
-                f.seek(0)
-                lines = f.readlines()
+            # Restore statistics up to the last checkpoint
+            offset = self.checkpoint_load()
 
-            start_time = []
-            for point in func(points, reconstruct):
-                self.update_statistics(point)
-                start_time.append(point.get('time_ms_utc'))
+            # Replay only the tail written after the checkpoint
+            start_time = [] if self.start_time is None else [self.start_time]
+            with open(self.temp_file_path, 'rb') as f:
+                f.seek(offset)
+                for point in func(io.TextIOWrapper(f, encoding = 'utf-8', errors = 'ignore'), reconstruct):
+                    self.update_statistics(point)
+                    if point.get('time_ms_utc') is not None:
+                        start_time.append(point['time_ms_utc'])
 
             self.start_time = min(start_time)
 
-        else:
-            # Open temporary file
-            with open(self.temp_file_path, 'r', encoding = 'utf-8') as f:
-                lines = f.readlines()
+    @property
+    def final_file(self):
+        '''
+            Finished track name, with the compressed extension when gzip is on
+        '''
+        return f'{self._output_file}{compressed_ext}' if self.compression else self._output_file
 
-        return lines
+    def final_open(self, newline = None):
+        '''
+            Create the finished track for writing, streamed through gzip when compression is on
+        '''
+        output_file_path = os.path.join(self.work_path, self.final_file)
+        if self.compression:
+            return gzip.open(output_file_path, 'xt', compresslevel = self.compression, encoding = 'utf-8', newline = newline)
+        return open(output_file_path, 'x', encoding = 'utf-8', newline = newline)
+
+    def copy_temp_body(self, file_handle):
+        '''
+            Stream the temporary file body into the final file in fixed-size chunks
+        '''
+        with open(self.temp_file_path, 'r', encoding = 'utf-8') as f:
+            shutil.copyfileobj(f, file_handle, copy_chunk_size)
 
     def generate_final_file(self, reconstruct = False):
         '''
             Generate the final GPX file with all recorded points
         '''
-        # Reconstruct lines
-        lines = self.reconstruct_file(parse_gpx_trkseg, reconstruct)
+        # Reconstruct statistics
+        self.reconstruct_file(iter_gpx_trkseg, reconstruct)
 
-        # Clean up temporary file
-        os.remove(self.temp_file_path)
-        print('[GPX]', f'Temporary file {self.temp_filename} deleted')
+        # Write final file: header, streamed points, footer
+        with self.final_open() as f:
+            f.write(self.create_gpx_header())
 
-        # Create GPX content
-        gpx_content = self.create_gpx_header()
+            # Add track start
+            f.write(f'<trk>\n <name>{self.track_name}</name>\n <trkseg>\n')
 
-        # Add track start
-        gpx_content += f'<trk>\n <name>{self.track_name}</name>\n <trkseg>\n'
+            # Add all points from temporary file
+            self.copy_temp_body(f)
 
-        # Read and add all points from temporary file
-        for line in lines:
-            line = line.strip()
-            if line:
-                gpx_content += f'  {line}\n'
+            # Close track
+            f.write(' </trkseg>\n</trk>\n')
+            f.write('</gpx>')
 
-        # Close track
-        gpx_content += ' </trkseg>\n</trk>\n'
-        gpx_content += '</gpx>'
+        print('[GPX]', f'Final file {self.final_file} created')
 
-        # Write final file
-        output_file_path = f'{os.path.join(self.work_path, self._output_file)}'
-        with open(output_file_path, 'x', encoding = 'utf-8') as f:
-            f.write(gpx_content)
-
-        print('[GPX]', f'Final file {self._output_file} created')
+        # Clean up temporary file
+        os.remove(self.temp_file_path)
+        self.checkpoint_remove()
+        print('[GPX]', f'Temporary file {os.path.basename(self.temp_file_path)} deleted')
 
     def create_gpx_header(self) -> str:
         '''
@@ -390,15 +501,15 @@ class GPXRecorder:
         if self.track_name:
             header += f'<name>{self.track_name}</name>\n'
 
-        header += f'<time>{utc_ms_to_gpx_time(self.start_time)}</time>\n'
+        header += f'<time>{utc_ms_to_gpx_time(self.start_time, self.milliseconds)}</time>\n'
 
         if self.activity:
             header += f'<keywords>{self.activity}</keywords>\n'
 
         # Bounds
         if self.points_count > 0:
-            header += f'<bounds minlat="{self.min_lat:.16f}" minlon="{self.min_lon:.16f}" '
-            header += f'maxlat="{self.max_lat:.16f}" maxlon="{self.max_lon:.16f}" />\n'
+            header += f'<bounds minlat="{self.min_lat:{self.bounds_spec}}" minlon="{self.min_lon:{self.bounds_spec}}" '
+            header += f'maxlat="{self.max_lat:{self.bounds_spec}}" maxlon="{self.max_lon:{self.bounds_spec}}" />\n'
         return header
 
     def stats_reset(self):
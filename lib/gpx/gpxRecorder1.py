@@ -17,6 +17,12 @@ class GPXRecorder1(GPXRecorder):
     '''
         Streaming GPX recorder that writes points in real-time using GPX 1.1 format
     '''
+    # GPX 1.1 uses extensions for custom fields like speed and accuracy (same point_fields order)
+    point_template = \
+    (
+        '<trkpt lat="{}" lon="{}"><ele>{}</ele><time>{}</time><sat>{}</sat>'
+        '<extensions><gpxtpx:speed>{}</gpxtpx:speed><gpxtpx:accuracy>{}</gpxtpx:accuracy></extensions></trkpt>'
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -32,59 +38,6 @@ class GPXRecorder1(GPXRecorder):
         self._temp_filename = f'{self.track_name}.gpx1_{self.units}'
         self.temp_file_path = os.path.join(self.work_path, self._temp_filename)
 
-    def point_to_string(self, point):
-        '''
-            Convert point to XML string for temporary working (GPX 1.1 format)
-        '''
-
-        # Latitude and longitude in decimal degrees
-        xml_parts = []
-        if point.get('latitude') is not None and point.get('longitude') is not None:
-            xml_parts.append(f'''<trkpt lat="{point.get('latitude'):.16f}" lon="{point.get('longitude'):.16f}">''')
-        else:
-            xml_parts.append(f'<trkpt lat=" " lon=" ">')
-
-        # Altitude in meters
-        if point.get('altitude_m') is not None:
-            xml_parts.append(f"<ele>{point.get('altitude_m'):.16f}</ele>")
-        else:
-            xml_parts.append(f'<ele> </ele>')
-
-        # UTC time in YYYY-MM-DDTHH:MM:SSZ
-        if point.get('time_ms_utc') is not None:
-            time_gpx = utc_ms_to_gpx_time(point.get('time_ms_utc'))
-        else:
-            time_gpx = utc_ms_to_gpx_time(utc_ms_time())
-        xml_parts.append(f'<time>{time_gpx}</time>')
-
-        # Number of sattelites used in fix
-        if point.get('satellites_used_in_fix') is not None:
-            xml_parts.append(f"<sat>{point.get('satellites_used_in_fix')}</sat>")
-        else:
-            xml_parts.append(f'<sat> </sat>')
-
-        # GPX 1.1 uses extensions for custom fields like speed and accuracy
-        extensions = []
-        # Speed in m/s
-        if point.get('speed_mps') is not None:
-            extensions.append(f"<gpxtpx:speed>{point.get('speed_mps'):.16f}</gpxtpx:speed>")
-        else:
-            extensions.append(f'<gpxtpx:speed> </gpxtpx:speed>')
-
-        # Accuracy in meters
-        if point.get('accuracy_m') is not None:
-            extensions.append(f"<gpxtpx:accuracy>{point.get('accuracy_m'):.16f}</gpxtpx:accuracy>")
-        else:
-            extensions.append(f'<gpxtpx:accuracy> </gpxtpx:accuracy>')
-
-        if extensions:
-            xml_parts.append('<extensions>')
-            xml_parts.extend(extensions)
-            xml_parts.append('</extensions>')
-
-        xml_parts.append('</trkpt>')
-        return ''.join(xml_parts)
-
     def create_gpx_header(self) -> str:
         '''
             Create GPX 1.1 file header with metadata and statistics
@@ -121,15 +74,15 @@ class GPXRecorder1(GPXRecorder):
         if self.track_name:
             header += f'  <name>{self.track_name}</name>\n'
 
-        header += f'<time>{utc_ms_to_gpx_time(self.start_time)}</time>\n'
+        header += f'<time>{utc_ms_to_gpx_time(self.start_time, self.milliseconds)}</time>\n'
 
         if self.activity:
             header += f'  <keywords>{self.activity}</keywords>\n'
 
         # Bounds (if we have points)
         if self.points_count > 0:
-            header += f'  <bounds minlat="{self.min_lat:.16f}" minlon="{self.min_lon:.16f}" '
-            header += f'maxlat="{self.max_lat:.16f}" maxlon="{self.max_lon:.16f}" />\n'
+            header += f'  <bounds minlat="{self.min_lat:{self.bounds_spec}}" minlon="{self.min_lon:{self.bounds_spec}}" '
+            header += f'maxlat="{self.max_lat:{self.bounds_spec}}" maxlon="{self.max_lon:{self.bounds_spec}}" />\n'
 
         header += '</metadata>\n'
         return header
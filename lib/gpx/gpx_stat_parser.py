@@ -1,50 +1,57 @@
-import re
-from lib.utils.units  import gpx_time_to_utc_ms
+import io
+import itertools
 
+from config          import parse_chunk_size
+from lib.gpx.track   import Track
+from lib.utils.units import gpx_time_to_utc_ms, parse_number
 
-def parse_all_gpx_statistics(gpx_content):
+
+# Header comment keys written by the recorders
+statistics_keys = \
+{
+    'GPX Version':    'version',
+    'Units':          'units',
+    'Track':          'track_points',
+    'Distance':       'distance',
+    'Duration':       'duration',
+    'Elevation Gain': 'elevation_gain',
+    'Elevation Loss': 'elevation_loss',
+    'Max Speed':      'speed_max',
+    'Avg Speed':      'speed_avg'
+}
+
+
+def parse_statistics_comments(comments, cast = int):
     '''
-        Parse all statistics from GPX comments including elevation changes and units.
+        Parse `Key = value [unit]` comment texts into statistics in one pass.
     '''
     statistics = {}
 
-    # Define patterns for each statistic
-    patterns = \
-    {
-        'version': r'GPX Version = ([\d.]+)\s*(\w+)?',
-        'units': r'Units = (\w+)',
-        'track_points': r'Track = (\d+) TrackPoints',
-        'distance': r'Distance = ([\d.]+)\s*(\w+)?',
-        'duration': r'Duration = ([\d:]+)',
-        'elevation_gain': r'Elevation Gain = ([\d.]+)\s*(\w+)?',
-        'elevation_loss': r'Elevation Loss = ([\d.]+)\s*(\w+)?',
-        'speed_max': r'Max Speed = ([\d.]+)\s*([\w/]+)?',
-        'speed_avg': r'Avg Speed = ([\d.]+)\s*([\w/]+)?'
-    }
+    for comment in comments:
+        key, sep, value = comment.partition(' = ')
+        key    = statistics_keys.get(key.strip())
+        fields = value.split()
+        if not sep or key is None or key in statistics or not fields:
+            continue
 
-    # Extract each statistic
-    for key, pattern in patterns.items():
-        match = re.search(pattern, gpx_content)
-        if match:
-            value = match.group(1)
-            if key in ['distance', 'elevation_gain', 'elevation_loss', 'speed_max', 'speed_avg']:
-                # Convert to float and store with unit
-                statistics[key] = \
-                {
-                    'value': int(value),
-                    'unit': match.group(2) if len(match.groups()) > 1 and match.group(2) else None
-                }
-            elif key == 'track_points':
-                statistics[key] = \
-                {
-                    'value': int(value),
-                    'unit': 'points'
-                }
-            else:
-                statistics[key] = \
-                {
-                    'value': value
-                }
+        if key in ['distance', 'elevation_gain', 'elevation_loss', 'speed_max', 'speed_avg']:
+            # Convert to number and store with unit
+            statistics[key] = \
+            {
+                'value': cast(float(fields[0])),
+                'unit':  fields[1] if len(fields) > 1 else None
+            }
+        elif key == 'track_points':
+            statistics[key] = \
+            {
+                'value': int(fields[0]),
+                'unit':  'points'
+            }
+        else:
+            statistics[key] = \
+            {
+                'value': fields[0]
+            }
 
     # Calculate net elevation change
     if 'elevation_gain' in statistics and 'elevation_loss' in statistics:
@@ -58,49 +65,119 @@ def parse_all_gpx_statistics(gpx_content):
     return statistics
 
 
-def parse_gpx_trkseg(gpx_content, reconstruct = False):
+def read_gpx_statistics(file):
+    '''
+        Parse statistics from the GPX comment header only - reading stops at the
+        `<gpx` root element, so the track body is never loaded.
     '''
-        Parse GPX track segments and extract lat/lon only - works for both GPX 1.0 and 1.1
-        using simple pattern.
-    '''
-    track_points = []
-
-    # Simple pattern
-    pattern = \
-    (
-        r'<trkpt[^>]+lat="([^"]+)"[^>]+lon="([^"]+)"[^>]*>'                                                  # lat, lon
-        r'(?:.*?<ele>([^<]+)</ele>)?'                                                                        # alt
-        r'(?:.*?<time>([^<]+)</time>)?'                                                                      # time
-        r'(?:.*?<sat>([^<]+)</sat>)?'                                                                        # sat
-        r'(?:.*?(?:<speed>([^<]+)</speed>|<gpxtpx:speed>([^<]+)</gpxtpx:speed>))?'                           # speed
-        r'(?:.*?(?:<custom:accuracy>([^<]+)</custom:accuracy>|<gpxtpx:accuracy>([^<]+)</gpxtpx:accuracy>))?' # accuracy
-        r'.*?</trkpt>'                                                                                       # allow anything until closing trkpt
-    )
-
-    matches         = re.findall(pattern, gpx_content)
-    cleaned_matches = [tuple(x for x in t if x != '') for t in matches]
-
-    for lat, lon, alt, time, sat, speed, accuracy in cleaned_matches:
-        if reconstruct:
-            track_points.append \
-            (
-                {
-                    'latitude':                         float(lat)      if lat      is not None else None,
-                    'longitude':                        float(lon)      if lon      is not None else None,
-                    'altitude_m':                       float(alt)      if alt      is not None else None,
-                    'time_ms_utc': int(gpx_time_to_utc_ms(str(time)))   if time     is not None else None,
-                    'speed_mps':                        float(speed)    if speed    is not None else None,
-                    'accuracy_m':                       float(accuracy) if accuracy is not None else None,
-                    'satellites_used_in_fix':           int(sat)        if sat      is not None else None
-                }
-            )
+    comments = []
+    for line in file:
+        line = line.strip()
+        if line.startswith('<gpx'):
+            break
+        if line.startswith('<!--') and line.endswith('-->'):
+            comments.append(line[4:-3])
 
-        else:
-            track_points.append \
-            (
-                {
-                    'lat': float(lat) if lat is not None else None,
-                    'lon': float(lon) if lon is not None else None
-                }
-            )
-    return track_points
+    return parse_statistics_comments(comments)
+
+
+def parse_all_gpx_statistics(gpx_content):
+    '''
+        Parse all statistics from GPX comments including elevation changes and units.
+    '''
+    return read_gpx_statistics(io.StringIO(gpx_content))
+
+
+def gpx_tag_value(fragment, tags):
+    '''
+        Return the text of the first tag found in a single trkpt fragment.
+    '''
+    for tag in tags:
+        start = fragment.find(f'<{tag}>')
+        if start != -1:
+            start += len(tag) + 2
+            end    = fragment.find(f'</{tag}>', start)
+            if end != -1:
+                return fragment[start:end]
+    return None
+
+
+def gpx_attr_value(fragment, attr):
+    '''
+        Return the value of an attribute of the trkpt element.
+    '''
+    start = fragment.find(f' {attr}="')
+    if start == -1:
+        return None
+
+    start += len(attr) + 3
+    return fragment[start:fragment.find('"', start)]
+
+
+def gpx_trkpt(fragment, reconstruct = False):
+    '''
+        Convert a single `<trkpt ...>...` fragment into a point dict.
+    '''
+    lat = parse_number(gpx_attr_value(fragment, 'lat'))
+    lon = parse_number(gpx_attr_value(fragment, 'lon'))
+
+    if not reconstruct:
+        return {'lat': lat, 'lon': lon}
+
+    time = gpx_tag_value(fragment, ('time',))
+    return \
+    {
+        'latitude':               lat,
+        'longitude':              lon,
+        'altitude_m':             parse_number(gpx_tag_value(fragment, ('ele',))),
+        'time_ms_utc':            gpx_time_to_utc_ms(time.strip()) if time and time.strip() else None,
+        'speed_mps':              parse_number(gpx_tag_value(fragment, ('speed', 'gpxtpx:speed'))),
+        'accuracy_m':             parse_number(gpx_tag_value(fragment, ('custom:accuracy', 'gpxtpx:accuracy'))),
+        'satellites_used_in_fix': parse_number(gpx_tag_value(fragment, ('sat',)), int)
+    }
+
+
+def iter_gpx_trkseg(file, reconstruct = False, chunk_size = parse_chunk_size):
+    '''
+        Lazily yield track points from a GPX file object - works for both GPX 1.0
+        and 1.1, final files and temporary (header-less) files.
+
+        The file is read in `chunk_size` pieces and scanned for complete
+        `<trkpt ...>...</trkpt>` elements, so memory use does not grow with
+        the track length. Incomplete trailing elements are ignored.
+    '''
+    tail = ''
+    for chunk in iter(lambda: file.read(chunk_size), ''):
+        buffer = tail + chunk
+        pos    = 0
+
+        while True:
+            start = buffer.find('<trkpt', pos)
+            if start == -1:
+                pos = max(pos, len(buffer) - 5)  # keep a possibly split '<trkpt'
+                break
+
+            end = buffer.find('</trkpt>', start)
+            if end == -1:
+                pos = start
+                break
+
+            yield gpx_trkpt(buffer[start:end], reconstruct)
+            pos = end + 8
+
+        tail = buffer[pos:]
+
+
+def read_gpx_track(file, step = 1, columns = ('lat', 'lon')):
+    '''
+        Read every `step`-th point of a GPX file object into a columnar Track.
+    '''
+    reconstruct = columns != ('lat', 'lon')
+    return Track.from_points(itertools.islice(iter_gpx_trkseg(file, reconstruct), 0, None, step), columns)
+
+
+def parse_gpx_trkseg(gpx_content, reconstruct = False):
+    '''
+        Parse GPX track segments from a string - works for both GPX 1.0 and 1.1.
+    '''
+    return list(iter_gpx_trkseg(io.StringIO(gpx_content), reconstruct))
@@ -0,0 +1,83 @@
+import os
+import time
+
+from config import commit_points, commit_seconds, commit_fsync
+
+
+class PointWriter:
+    '''
+        Buffered, group-committed writer for temporary track files.
+
+        Points are kept in memory and written to the file in one go once
+        `commit_points` points are pending or `commit_seconds` seconds have
+        passed since the last commit. Closing the writer (pause/stop) always
+        commits. If the service is killed, at most the uncommitted window
+        (`commit_points` points or `commit_seconds` seconds) is lost.
+    '''
+    def __init__ \
+        (
+            self,
+            path:           str,
+            mode:           str   = 'w',
+            commit_points:  int   = commit_points,
+            commit_seconds: float = commit_seconds,
+            fsync:          bool  = commit_fsync,
+            on_commit             = None
+        ):
+        if commit_points < 1:
+            raise ValueError('[WRITER] Commit points must be at least 1.')
+        if commit_seconds < 0:
+            raise ValueError('[WRITER] Commit seconds must not be negative.')
+
+        self.path           = path
+        self.commit_points  = commit_points
+        self.commit_seconds = commit_seconds
+        self.fsync          = fsync
+        self.on_commit      = on_commit
+
+        self.file        = open(path, mode, encoding = 'utf-8')
+        self.pending     = []
+        self.commit_last = time.monotonic()
+
+    @property
+    def closed(self):
+        return self.file.closed
+
+    def write(self, line):
+        '''
+            Queue a line and commit it when the policy says so
+        '''
+        self.write_many((line,))
+
+    def write_many(self, lines):
+        '''
+            Queue a batch of lines, checking the policy once after the whole batch
+        '''
+        self.pending.extend(lines)
+
+        if len(self.pending) >= self.commit_points or time.monotonic() - self.commit_last >= self.commit_seconds:
+            self.commit()
+
+    def commit(self):
+        '''
+            Write all pending lines with a single write and flush
+        '''
+        if self.pending:
+            self.file.write(''.join(self.pending))
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+            self.pending.clear()
+
+            if self.on_commit is not None:
+                self.on_commit(os.fstat(self.file.fileno()).st_size)
+
+        self.commit_last = time.monotonic()
+
+    def close(self):
+        '''
+            Commit pending lines and close the file
+        '''
+        if not self.file.closed:
+            self.commit()
+            self.file.close()
@@ -0,0 +1,30 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize = None)
+def compile_point_format(template, specs):
+    '''
+        Compile a recorder trackpoint template once per format and precision.
+
+        The template has one ``{}`` slot per field, in the order of `specs`.
+        When every value is present the whole point is one ``str.format``
+        call on a template with the specs already in place; a missing value
+        (None) takes the slower path that formats field by field and writes
+        ' ' in its place, the way the recorders always marked blanks.
+
+        Args:
+            template (str): Trackpoint text with ``{}`` slots (literal braces doubled)
+            specs (tuple): Format spec per slot, e.g. ('.16f', '.16f', '', ...)
+
+        Returns:
+            function: values (sequence in slot order) -> str
+    '''
+    full    = template.format(*(f'{{{i}:{spec}}}' for i, spec in enumerate(specs))).format
+    partial = template.format
+
+    def point_format(values):
+        if None not in values:
+            return full(*values)
+        return partial(*(' ' if value is None else format(value, spec) for value, spec in zip(values, specs)))
+
+    return point_format
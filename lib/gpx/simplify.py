@@ -0,0 +1,84 @@
+import heapq
+
+
+def triangle_area(xs, ys, a, b, c):
+    return abs((xs[a] - xs[b]) * (ys[c] - ys[b]) - (xs[c] - xs[b]) * (ys[a] - ys[b])) / 2
+
+
+def visvalingam(track, budget = None, tolerance = None):
+    '''
+        Shape-preserving simplification (Visvalingam-Whyatt with a heap), O(n log n).
+
+        Coordinates are normalised to the track bounding box, the same way `Map`
+        stretches them into a thumbnail, so `tolerance` is a fraction of the
+        thumbnail size (e.g. 1 px / 100 px = 0.01). Points are removed,
+        smallest effective area first, until at most `budget` points remain and
+        every remaining point has an area of at least `tolerance`².
+
+        Args:
+            track (Track): Track with ``lat`` and ``lon`` columns
+            budget (int): Maximum number of points to keep (None for no limit)
+            tolerance (float): Minimum feature size as a fraction of the thumbnail (None for no limit)
+
+        Returns:
+            Track: Simplified track with the same columns, first and last point kept
+    '''
+    # Points with missing coordinates can't be drawn
+    rows = [i for i, (lat, lon) in enumerate(zip(track.data['lat'], track.data['lon'])) if lat == lat and lon == lon]
+    n    = len(rows)
+
+    threshold = None if tolerance is None else tolerance ** 2
+    if n < 3 or (budget is None and threshold is None) or (threshold is None and n <= budget):
+        return track.take(rows)
+
+    # Normalise into the unit square
+    lats = [track.data['lat'][i] for i in rows]
+    lons = [track.data['lon'][i] for i in rows]
+
+    min_lat, max_lat = min(lats), max(lats)
+    min_lon, max_lon = min(lons), max(lons)
+    span_lat = (max_lat - min_lat) or 1
+    span_lon = (max_lon - min_lon) or 1
+
+    xs = [(lon - min_lon) / span_lon for lon in lons]
+    ys = [(lat - min_lat) / span_lat for lat in lats]
+
+    # Doubly linked list over the remaining points
+    left  = list(range(-1, n - 1))
+    right = list(range(1, n + 1))
+
+    area = [0.0] * n
+    for i in range(1, n - 1):
+        area[i] = triangle_area(xs, ys, i - 1, i, i + 1)
+
+    heap = [(area[i], i) for i in range(1, n - 1)]
+    heapq.heapify(heap)
+
+    removed   = bytearray(n)
+    remaining = n
+    area_last = 0.0
+
+    while heap:
+        a, i = heapq.heappop(heap)
+        if removed[i] or a != area[i]:
+            continue  # stale heap entry
+
+        if (budget is None or remaining <= budget) and (threshold is None or a >= threshold):
+            break
+
+        removed[i] = 1
+        remaining -= 1
+
+        # Effective areas never decrease, so removal order stays consistent
+        area_last = max(area_last, a)
+
+        p, q     = left[i], right[i]
+        right[p] = q
+        left[q]  = p
+
+        for j in (p, q):
+            if 0 < j < n - 1:
+                area[j] = max(area_last, triangle_area(xs, ys, left[j], j, right[j]))
+                heapq.heappush(heap, (area[j], j))
+
+    return track.take([rows[i] for i in range(n) if not removed[i]])
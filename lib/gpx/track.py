@@ -0,0 +1,124 @@
+from array import array
+
+
+class Track:
+    '''
+        Compact, column-oriented track container.
+
+        Every column is an ``array('d')`` (8 bytes per value), missing values
+        are stored as NaN. Only the requested columns are allocated, so a
+        lat/lon thumbnail costs 16 bytes per point instead of a dict per point.
+
+        Columns: lat, lon, ele, time (UTC ms), speed (m/s), accuracy (m), sats
+    '''
+    columns_all = ('lat', 'lon', 'ele', 'time', 'speed', 'accuracy', 'sats')
+
+    # Column -> point dict key written by the GNSS transformer / parsers
+    point_keys = \
+    {
+        'lat':      'latitude',
+        'lon':      'longitude',
+        'ele':      'altitude_m',
+        'time':     'time_ms_utc',
+        'speed':    'speed_mps',
+        'accuracy': 'accuracy_m',
+        'sats':     'satellites_used_in_fix'
+    }
+
+    def __init__(self, columns = ('lat', 'lon'), data = None):
+        for name in columns:
+            if name not in self.columns_all:
+                raise ValueError(f'[TRACK] Unknown column {name!r}.')
+
+        data         = data or {}
+        self.columns = tuple(columns)
+        self.data    = {name: array('d', data.get(name, ())) for name in self.columns}
+
+    def __len__(self):
+        return len(self.data[self.columns[0]]) if self.columns else 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return Track(self.columns, {name: column[index] for name, column in self.data.items()})
+        return {name: column[index] for name, column in self.data.items()}
+
+    def take(self, indices):
+        '''
+            Return a new Track with the rows at `indices`
+        '''
+        return Track(self.columns, {name: [column[i] for i in indices] for name, column in self.data.items()})
+
+    @property
+    def nbytes(self):
+        return sum(column.itemsize * len(column) for column in self.data.values())
+
+    def append(self, point):
+        '''
+            Append a point dict, short ('lat') or long ('latitude') keys
+        '''
+        for name, column in self.data.items():
+            value = point.get(name)
+            if value is None:
+                value = point.get(self.point_keys[name])
+            column.append(float('nan') if value is None else value)
+
+    def extend(self, points):
+        for point in points:
+            self.append(point)
+
+    @classmethod
+    def from_points(cls, points, columns = ('lat', 'lon')):
+        track = cls(columns)
+        track.extend(points)
+        return track
+
+    def to_dict(self):
+        '''
+            JSON-serialisable form {column: [values]}
+        '''
+        return {name: column.tolist() for name, column in self.data.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        '''
+            Build from `to_dict` output, or from a legacy list of {'lat', 'lon'} dicts
+        '''
+        if isinstance(data, Track):
+            return data
+        if isinstance(data, (list, tuple)):
+            return cls.from_points(data)
+        return cls(tuple(data), data)
+
+    def bounds(self):
+        '''
+            Return (min_lat, min_lon, max_lat, max_lon), NaN values ignored
+        '''
+        lats = [lat for lat in self.data['lat'] if lat == lat]
+        lons = [lon for lon in self.data['lon'] if lon == lon]
+        if not lats or not lons:
+            return None
+        return min(lats), min(lons), max(lats), max(lons)
+
+    def normalize(self, x, y, width, height):
+        '''
+            Map lat/lon into the box (x, y, width, height) as a flat [x0, y0, x1, y1, ...] list.
+            Degenerate axes are centred, points with missing coordinates are skipped.
+        '''
+        bounds = self.bounds()
+        if bounds is None:
+            return []
+
+        min_lat, min_lon, max_lat, max_lon = bounds
+
+        # Scale and offset resolved once, applied per point
+        scale_x  = width  / (max_lon - min_lon) if max_lon != min_lon else 0
+        scale_y  = height / (max_lat - min_lat) if max_lat != min_lat else 0
+        offset_x = x if scale_x else x + width  / 2
+        offset_y = y if scale_y else y + height / 2
+
+        points = []
+        for lat, lon in zip(self.data['lat'], self.data['lon']):
+            if lat == lat and lon == lon:
+                points.append((lon - min_lon) * scale_x + offset_x)
+                points.append((lat - min_lat) * scale_y + offset_y)
+        return points
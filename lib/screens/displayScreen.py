@@ -1,4 +1,3 @@
-import json
 import os
 
 from kivy   import platform
@@ -21,7 +20,7 @@ from kivymd.uix.screen      import MDScreen
 from lib.utils.buttons import CustomToggleButton, CustomButton
 from lib.utils.card    import GpsDisplay
 from lib.utils.label   import MockBanner
-from lib.utils.paths   import tracks_folder, load_path, gnss_log
+from lib.utils.paths   import tracks_folder, load_path, gnss_socket, gnss_ring
 from lib.utils.saver   import Saver
 from lib.utils.service import gnss_check
 from lib.utils.units   import \
@@ -36,6 +35,9 @@ from lib.utils.units   import \
     utc_ms_time
 )
 
+from lib.utils.pointChannel import PointChannel, LatencyStats
+from lib.utils.pointRing    import PointRing
+
 if platform == 'android':
     from android.permissions import check_permission, Permission
 
@@ -139,11 +141,17 @@ class DisplayScreen(MDScreen, Saver):
         self.layout.bind(minimum_height = self.layout.setter('height'))
 
         # GNSS init
-        self.folder   = load_path(tracks_folder, path_only = True)
-        self.gnss_log = load_path(gnss_log)
+        self.folder = load_path(tracks_folder, path_only = True)
+
+        # Live points pushed by the service, the ring buffer (recent history) is polled only without the socket channel
+        self.latency           = LatencyStats('[DISPLAY]')
+        self.ring              = PointRing(load_path(gnss_ring))
+        self.channel           = PointChannel(load_path(gnss_socket))
+        self.channel_listening = self.channel.listen(self.on_point)
 
         # Last init
-        self.mtime_gnss_last    = None
+        self.point_time_last    = utc_ms_time() / 1000
+        self.ring_sequence_last = self.ring.sequence
         self.is_recording_last  = None
         self.service_state_last = None
         self.gnss_check_last    = None
@@ -225,10 +233,20 @@ class DisplayScreen(MDScreen, Saver):
 
                 self.gnss_check_last = check
 
-            # gnss file mtime
-            mtime        = os.path.getmtime(self.gnss_log)
+            # newest fix in the ring buffer (no socket channel)
+            if not self.channel_listening and self.ring.sequence != self.ring_sequence_last:
+                self.ring_sequence_last = self.ring.sequence
+                latest                  = self.ring.latest()
+
+                if latest is not None:
+                    point, sent_ns       = latest
+                    self.point_time_last = sent_ns / 1e9
+
+                    self.display_drawer(point)
+                    self.latency.add(point, sent_ns)
+
             current_time = utc_ms_time() / 1000
-            diff         = current_time - mtime
+            diff         = current_time - self.point_time_last
 
             if diff > self.threshold:
                 text = 'waiting for location data...'
@@ -240,18 +258,31 @@ class DisplayScreen(MDScreen, Saver):
                 self.toast_waiting_show = \
                     self.toast_display(text, self.toast_waiting_show, self.toast_waiting_reset, self.threshold, None)
 
-            # file changed
-            if mtime != self.mtime_gnss_last:
-                with open(self.gnss_log, 'r', encoding = 'utf-8') as f:
-                    point = json.load(f)
-
-                # update display & mtime
-                self.display_drawer(point)
-                self.mtime_gnss_last = mtime
+                # The service may have recreated the ring meanwhile
+                self.ring.reopen()
 
         except Exception as e:
             print('[DISPLAY]', f'Gnss watcher error: {e}')
 
+    def on_point(self, point, sent_ns):
+        '''
+            Point pushed by the service (main thread)
+        '''
+        try:
+            self.point_time_last = utc_ms_time() / 1000
+            self.display_drawer(point)
+            self.latency.add(point, sent_ns)
+
+        except Exception as e:
+            print('[DISPLAY]', f'Point channel error: {e}')
+
+    def recent_points(self, count = None):
+        '''
+            Up to `count` most recent fixes (all kept by the ring by default), oldest first
+        '''
+        records, _ = self.ring.read(limit = count)
+        return [point for point, sent_ns in records]
+
     def recording_toast_watcher(self):
         try:
             is_recording = self.storage['is_recording']['value']
@@ -121,12 +121,14 @@ class NavigationScreen(MDScreen):
             self.btn_disabled(True)
 
     def btn_disabled(self, state):
-        self.OptionsScreen.slider_interval.disabled = state
-        self.OptionsScreen.slider_distance.disabled = state
-        self.OptionsScreen.button_units   .disabled = state
-        self.OptionsScreen.button_format  .disabled = state
-        self.OptionsScreen.button_shutdown.disabled = state
-        self.OptionsScreen.button_reset   .disabled = state
+        self.OptionsScreen.slider_interval .disabled = state
+        self.OptionsScreen.slider_distance .disabled = state
+        self.OptionsScreen.button_units    .disabled = state
+        self.OptionsScreen.button_format   .disabled = state
+        self.OptionsScreen.button_batching .disabled = state
+        self.OptionsScreen.button_precision.disabled = state
+        self.OptionsScreen.button_shutdown .disabled = state
+        self.OptionsScreen.button_reset    .disabled = state
 
     def on_size(self, *args):
         self.nav_bar.update_navigation_height()
@@ -34,6 +34,9 @@ class OptionsScreen(MDScreen, Saver):
     format = StringProperty(default_settings['format']['value'])
     units  = StringProperty(default_settings['units'] ['value'])
 
+    batching  = StringProperty(default_settings['batching'] ['value'])
+    precision = StringProperty(default_settings['precision']['value'])
+
     shutdown = BooleanProperty(False)
 
     def __init__(self, **kwargs):
@@ -169,6 +172,38 @@ class OptionsScreen(MDScreen, Saver):
                         height      = dp(2)
                     ),
                     MDNavigationDrawerDivider(padding = [dp(0), dp(0), dp(3), dp(0)]),
+                    CustomLabel(text = 'location batching'),
+                    MDFloatLayout \
+                    (
+                        MDFillRoundFlatButton \
+                        (
+                            id         = 'BATCHING',
+                            text       = self.batching,
+                            on_press   = self.on_btn_press,
+                            _min_width = dp(110),
+                            pos_hint   = {'right': 1, 'center_y': 0.6},
+                            disabled   = False
+                        ),
+                        size_hint_y = None,
+                        height      = dp(2)
+                    ),
+                    MDNavigationDrawerDivider(padding = [dp(0), dp(0), dp(3), dp(0)]),
+                    CustomLabel(text = 'number precision'),
+                    MDFloatLayout \
+                    (
+                        MDFillRoundFlatButton \
+                        (
+                            id         = 'PRECISION',
+                            text       = self.precision,
+                            on_press   = self.on_btn_press,
+                            _min_width = dp(110),
+                            pos_hint   = {'right': 1, 'center_y': 0.6},
+                            disabled   = False
+                        ),
+                        size_hint_y = None,
+                        height      = dp(2)
+                    ),
+                    MDNavigationDrawerDivider(padding = [dp(0), dp(0), dp(3), dp(0)]),
                     CustomLabel(text = 'shutdown'),
                     MDFloatLayout \
                     (
@@ -220,15 +255,15 @@ class OptionsScreen(MDScreen, Saver):
         self.layout = main_layout.children[0].children[0]
 
         # update interval
-        self.label_interval  = self.layout.children[21].children[1]
-        self.slider_interval = self.layout.children[21].children[0]
+        self.label_interval  = self.layout.children[27].children[1]
+        self.slider_interval = self.layout.children[27].children[0]
 
         # update distance
-        self.label_distance  = self.layout.children[18].children[1]
-        self.slider_distance = self.layout.children[18].children[0]
+        self.label_distance  = self.layout.children[24].children[1]
+        self.slider_distance = self.layout.children[24].children[0]
 
         # screen
-        self.button_screen = self.layout.children[15].children[0]
+        self.button_screen = self.layout.children[21].children[0]
         self.texts_screen  = params['screen']
         self.menu_screen   = CustomDropdownMenu \
         (
@@ -238,7 +273,7 @@ class OptionsScreen(MDScreen, Saver):
         )
 
         # theme
-        self.button_theme = self.layout.children[12].children[0]
+        self.button_theme = self.layout.children[18].children[0]
         self.texts_theme  = params['theme']
         self.menu_theme   = CustomDropdownMenu \
         (
@@ -248,7 +283,7 @@ class OptionsScreen(MDScreen, Saver):
         )
 
         # units
-        self.button_units = self.layout.children[9].children[0]
+        self.button_units = self.layout.children[15].children[0]
         self.texts_units  = params['units']
         self.menu_units   = CustomDropdownMenu \
         (
@@ -258,7 +293,7 @@ class OptionsScreen(MDScreen, Saver):
         )
 
         # record format
-        self.button_format = self.layout.children[6].children[0]
+        self.button_format = self.layout.children[12].children[0]
         self.texts_format  = params['format']
         self.menu_format   = CustomDropdownMenu \
         (
@@ -267,6 +302,26 @@ class OptionsScreen(MDScreen, Saver):
             caller         = self.button_format  # Set the caller to the button that was clicked on
         )
 
+        # location batching
+        self.button_batching = self.layout.children[9].children[0]
+        self.texts_batching  = params['batching']
+        self.menu_batching   = CustomDropdownMenu \
+        (
+            menu_texts     = self.texts_batching,
+            callback_owner = self,
+            caller         = self.button_batching  # Set the caller to the button that was clicked on
+        )
+
+        # number precision
+        self.button_precision = self.layout.children[6].children[0]
+        self.texts_precision  = params['precision']
+        self.menu_precision   = CustomDropdownMenu \
+        (
+            menu_texts     = self.texts_precision,
+            callback_owner = self,
+            caller         = self.button_precision  # Set the caller to the button that was clicked on
+        )
+
         # shutdown & reset
         self.button_shutdown = self.layout.children[3].children[0]
         self.button_reset    = self.layout.children[0].children[0]
@@ -298,6 +353,9 @@ class OptionsScreen(MDScreen, Saver):
         self.button_units .text = self.units
         self.button_format.text = self.format
 
+        self.button_batching .text = self.batching
+        self.button_precision.text = self.precision
+
     def label_interval_value(self, value):
         return f'{int(value)} s'
 
@@ -334,6 +392,10 @@ class OptionsScreen(MDScreen, Saver):
             self.menu_units.open()
         elif btn.id == 'FORMAT':
             self.menu_format.open()
+        elif btn.id == 'BATCHING':
+            self.menu_batching.open()
+        elif btn.id == 'PRECISION':
+            self.menu_precision.open()
         elif btn.id == 'SHUTDOWN':
             self.shutdown = True
         else:
@@ -403,6 +465,28 @@ class OptionsScreen(MDScreen, Saver):
             toast(f'format set to {self.format}')
             self.menu_format.dismiss()
 
+        # Batching Menu
+        elif txt in self.texts_batching:
+            self.button_batching.text = txt
+            self.batching             = self.button_batching.text
+
+            # Only save if we have a JsonStore (file exists)
+            print('[OPTION]', f'Location batching changed: {self.batching}')
+            self.instant_save('batching', self.batching)
+            toast(f'batching set to {self.batching}')
+            self.menu_batching.dismiss()
+
+        # Precision Menu
+        elif txt in self.texts_precision:
+            self.button_precision.text = txt
+            self.precision             = self.button_precision.text
+
+            # Only save if we have a JsonStore (file exists)
+            print('[OPTION]', f'Number precision changed: {self.precision}')
+            self.instant_save('precision', self.precision)
+            toast(f'precision set to {self.precision}')
+            self.menu_precision.dismiss()
+
     def apply_screen_setting(self):
         if platform == 'android':
 
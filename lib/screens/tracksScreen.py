@@ -1,30 +1,33 @@
 import os
+import shutil
 
+from bisect     import bisect_left
 from kivy       import platform
-from config     import app_name, points_limit, toast_duration
+from config     import app_name, toast_duration, rebuild_threshold, show_page_size, copy_chunk_size
 from kivy.clock import Clock
 
 from kivymd.material_resources import dp
 from kivymd.toast              import toast
 
-from kivymd.uix.boxlayout  import MDBoxLayout
-from kivymd.uix.list       import MDList
-from kivymd.uix.screen     import MDScreen
-from kivymd.uix.scrollview import MDScrollView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+
+from kivymd.uix.boxlayout   import MDBoxLayout
+from kivymd.uix.recycleview import MDRecycleView
+from kivymd.uix.screen      import MDScreen
 
 from lib.gpx.csvRecorder  import CSVRecorder
 from lib.gpx.gpxRecorder  import GPXRecorder
 from lib.gpx.gpxRecorder1 import GPXRecorder1
 
 from lib.utils.buttons  import CustomFlatButton
+from lib.utils.indexer  import Indexer
 from lib.utils.label    import MockBanner
 from lib.utils.listItem import ListItem
-from lib.utils.paths    import tracks_folder, working_path, load_path, track_stats_json
+from lib.utils.paths    import tracks_folder, thumbnails_folder, working_path, load_path, track_stats_db, checkpoint_ext, track_exts, track_base, open_track
 from lib.utils.popups   import CustomDialog
 from lib.utils.saver    import Saver
 
-from lib.gpx.csv_stat_parser import parse_csv_dict, parse_all_csv_statistics
-from lib.gpx.gpx_stat_parser import parse_all_gpx_statistics, parse_gpx_trkseg
+from lib.utils.thumbnails import thumbnail_path, remove_thumbnail
 
 
 if platform == 'android':
@@ -41,8 +44,9 @@ class TracksScreen(MDScreen, Saver):
         print('[TRACK]', 'init')
 
         # storage init
-        self.folder  = load_path(tracks_folder)
-        self.storage = load_path(track_stats_json)
+        self.folder     = load_path(tracks_folder)
+        self.thumbnails = load_path(thumbnails_folder)
+        self.storage    = load_path(track_stats_db)
 
         self.dialog = CustomDialog \
         (
@@ -57,7 +61,8 @@ class TracksScreen(MDScreen, Saver):
 
         # Tracks init
         self.track          = None
-        self.last_signature = None  # signature for change tracking
+        self.last_signature = None  # folder fingerprint for change tracking
+        self.indexer        = Indexer()
 
         # Main layout
         main_layout = MDBoxLayout(orientation = 'vertical', spacing = 0)
@@ -67,18 +72,24 @@ class TracksScreen(MDScreen, Saver):
 
         # Remaining layout
         main_layout.add_widget(self.mock_banner)
-        main_layout.add_widget \
-        (
-            MDScrollView \
-            (
-                MDList(spacing = dp(2))
-            )
 
+        # Virtualised list: only the visible rows are ListItem widgets, recycled while scrolling
+        layout = RecycleBoxLayout \
+        (
+            default_size      = (None, dp(80)),
+            default_size_hint = (1, None),
+            size_hint_y       = None,
+            orientation       = 'vertical',
+            spacing           = dp(2)
         )
+        layout.bind(minimum_height = layout.setter('height'))
+
+        self.list = MDRecycleView(viewclass = ListItem)
+        self.list.add_widget(layout)
+        main_layout.add_widget(self.list)
 
         # Add the main layout to screen
         self.add_widget(main_layout)
-        self.list = main_layout.children[0].children[0]
 
         if platform == 'android':
             from androidstorage4kivy import SharedStorage
@@ -127,29 +138,44 @@ class TracksScreen(MDScreen, Saver):
                         except Exception as e:
                             print('[TRACK]', f"File {track} couldn't be deleted: {e}")
 
+            # Remove checkpoints left without their temporary file
+            for checkpoint in os.listdir(self.folder):
+                if checkpoint.endswith(checkpoint_ext) or checkpoint.endswith(f'{checkpoint_ext}.tmp'):
+                    track = checkpoint.split(checkpoint_ext)[0]
+                    if not os.path.exists(os.path.join(self.folder, track)):
+                        os.remove(os.path.join(self.folder, checkpoint))
+                        print('[TRACK]', f'Checkpoint {checkpoint} was deleted')
+
         except Exception as e:
             print('[TRACK]', f'Finalization error: {e}')
 
     def scan_tracks(self):
-        return [track for track in os.listdir(self.folder) if track.endswith('.gpx') or track.endswith('.csv')]
+        '''
+            One directory pass: {track: (mtime_ns, size)} for every finished track
+        '''
+        tracks = {}
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.name.endswith(track_exts):
+                    stat = entry.stat()
+                    tracks[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return tracks
 
     def scan_storage(self):
-        tracks  = []
-        for name in self.storage:
-            format = self.storage[name]['format']['value']
-            track  = self.name_reconstruction(name, format)
-            tracks.append(track)
+        '''
+            {track: (mtime_ns, size)} as indexed, None for entries stored without a fingerprint
+        '''
+        tracks = {}
+        for name, stats in self.stored():
+            track = self.track_file(name, stats)
+            if 'mtime_ns' in stats and 'size' in stats:
+                tracks[track] = (stats['mtime_ns']['value'], stats['size']['value'])
+            else:
+                tracks[track] = None
         return tracks
 
     def signature(self, tracks):
-        tracks_sorted = sorted(tracks, reverse = True)
-        sig = None
-        for track in tracks_sorted:
-            if sig is None:
-                sig = track
-            else:
-                sig += f'|{track}'
-        return sig
+        return frozenset(tracks.items())
 
     def synchronize(self):
         # synchronize the storage (or in-memory dict storage) with the track folder
@@ -158,86 +184,118 @@ class TracksScreen(MDScreen, Saver):
             signature = self.signature(tracks)
 
             if signature == self.last_signature:
-                print('[TRACK]', 'no changes:', signature)
+                print('[TRACK]', f'no changes: {len(tracks)} tracks')
             else:
-                print('[TRACK]', 'changes detected:', f'{self.last_signature} -> {signature}')
                 storage = self.scan_storage()
+                added   = tracks.keys()  - storage.keys() - self.indexer.pending()
+                removed = storage.keys() - tracks.keys()
 
-                for track in tracks:
-                    if track not in storage:
-                        self.put_storage(track)
+                # Rewritten tracks and entries without a fingerprint (legacy) are re-indexed
+                updated = {track for track in tracks.keys() & storage.keys() if tracks[track] != storage[track]}
+                print('[TRACK]', f'changes detected: {len(added)} added, {len(removed)} removed, {len(updated)} updated')
 
-                for track in storage:
-                    if track not in tracks:
-                        self.remove_storage(track)
+                for track in removed:
+                    self.remove_storage(track)
+
+                # Tracks deleted while still being indexed
+                for track in [track for track in self.indexer.jobs if track not in tracks]:
+                    self.indexer.cancel(track)
+                    self.show_remove(track)
+
+                # Rows are patched in place once the list is populated, rebuilt otherwise
+                if self.list.data:
+                    for track in removed:
+                        self.show_remove(track)
+                else:
+                    self.show()
+
+                # New tracks get a placeholder row until their stats are ready
+                for track in added:
+                    self.show_remove(track)
+                    self.show_insert(track, self.placeholder(track, tracks[track][0]))
+
+                # Many new tracks (upgrade, lost store) are indexed in one parallel batch
+                if len(added) >= rebuild_threshold:
+                    self.rebuild_index(added)
+                    added = set()
+
+                for track in added | updated:
+                    self.put_storage(track)
 
-                self.show()
                 self.last_signature = signature
 
         except Exception as e:
             print('[TRACK]', f'Synchronization error: {e}')
 
     def put_storage(self, track):
+        '''
+            Index `track` in the background, `on_indexed` stores the result
+        '''
         try:
-            track_path = os.path.join(self.folder, track)
-            mtime      = os.path.getmtime(track_path)
+            self.indexer.submit \
+            (
+                track,
+                os.path.join(self.folder, track),
+                thumbnail_path(self.thumbnails, track),
+                self.on_indexed
+            )
 
-            with open(track_path, 'r', encoding = 'utf-8') as f:
-                content = f.read()
+        except Exception as e:
+            print('[TRACK]', f"File {track} couldn't be queued for indexing: {e}")
+
+    def on_indexed(self, track, track_data, error):
+        if error is not None:
+            print('[TRACK]', f"File {track} couldn't be inserted into the storage: {error}")
+            self.show_remove(track)
+            return
+
+        track_name = self.name_extraction(track)[0]
+        self.instant_save(track_name, track_data)
+
+        self.show_remove(track)
+        self.show_insert(track)
+        self.show_redraw(track)
+
+    def rebuild_index(self, tracks = None):
+        '''
+            Re-index `tracks` (the whole folder by default) in parallel worker processes,
+            `on_rebuilt` writes the results to the store in one go
+        '''
+        try:
+            tracks = self.scan_tracks() if tracks is None else tracks
+            jobs   = \
+            {
+                track: (os.path.join(self.folder, track), thumbnail_path(self.thumbnails, track))
+                for track in tracks
+            }
+            self.indexer.rebuild(jobs, self.on_rebuilt)
 
-            if track.endswith('.csv'):
-                stats  = parse_all_csv_statistics(content)
-                loc    = parse_csv_dict(content)
-                format = 'csv'
-            else:
-                stats  = parse_all_gpx_statistics(content)
-                loc    = parse_gpx_trkseg(content)
-                format = 'gpx'
+        except Exception as e:
+            print('[TRACK]', f'Index rebuild error: {e}')
 
-            points_total = len(loc)
-            if points_total <= points_limit:
-                points_to_show = loc
-            else:
-                step = max(1, points_total // points_limit)
-                points_to_show = loc[::step]
+    def on_rebuilt(self, results, errors):
+        for track, error in errors.items():
+            print('[TRACK]', f"File {track} couldn't be inserted into the storage: {error}")
 
-            track_data = \
-            {
-                'mtime':          {'value': mtime},
-                'format':         {'value': format},
-                'units':          {'value': stats['units']['value']},
-                'points':         {'value': stats['track_points']['value']},
-                'duration':       {'value': stats['duration']['value']},
-                'distance':       {
-                                      'value': stats['distance']['value'],
-                                      'unit':  stats['distance']['unit']
-                                  },
-                'altitude_gap':   {
-                                      'value': stats['net_elevation_change']['value'],
-                                      'unit':  stats['net_elevation_change']['unit']
-                                  },
-                'speed_max':      {
-                                      'value': stats['speed_max']['value'],
-                                      'unit':  stats['speed_max']['unit']
-                                  },
-                'speed_avg':      {
-                                      'value': stats['speed_avg']['value'],
-                                      'unit':  stats['speed_avg']['unit']
-                                  },
-                'points_to_show': {'value': points_to_show}
-            }
-            if format == 'gpx':
-                track_data.update({'version': {'value': stats['version']['value']}})
+        # Tracks deleted during the rebuild are dropped with their thumbnails
+        for track in [track for track in results if not os.path.exists(os.path.join(self.folder, track))]:
+            remove_thumbnail(thumbnail_path(self.thumbnails, track))
+            del results[track]
 
-            track_name = self.name_extraction(track)[0]
-            self.instant_save(track_name, track_data)
+        self.bulk_save({self.name_extraction(track)[0]: track_data for track, track_data in results.items()})
+        print('[TRACK]', f'Index rebuilt: {len(results)} tracks, {len(errors)} errors')
 
-        except Exception as e:
-            print('[TRACK]', f"File {track} couldn't be inserted into the storage: {e}")
+        # Pending rows of the rebuilt tracks are replaced by the stored ones
+        pending      = self.indexer.pending()
+        placeholders = [d for d in self.list.data if d['txt'] in pending and not d['cache_path']]
+        self.show()
+        for row in placeholders:
+            self.show_insert(row['txt'], row)
 
     def remove_storage(self, track):
         try:
             track_name = self.name_extraction(track)[0]
+            remove_thumbnail(thumbnail_path(self.thumbnails, track))
 
             if isinstance(self.storage, dict):
                 self.storage.pop(track_name)
@@ -260,36 +318,116 @@ class TracksScreen(MDScreen, Saver):
             print('[TRACK]', f"File {track} couldn't be deleted from the folder: {e}")
             toast(f"{track} couldn't be deleted")
 
+    def stored(self):
+        '''
+            Stored (name, stats) pairs, newest first; the catalogue is read page by page
+        '''
+        if isinstance(self.storage, dict):
+            return sorted(self.storage.items(), key = lambda item: item[1]['mtime']['value'], reverse = True)
+
+        entries = []
+        while True:
+            page = self.storage.query(order = 'mtime', descending = True, limit = show_page_size, offset = len(entries))
+            entries.extend(page)
+            if len(page) < show_page_size:
+                return entries
+
+    def track_file(self, name, stats):
+        '''
+            File name of the stored track `name` (entries indexed before compression have no 'file')
+        '''
+        if 'file' in stats:
+            return stats['file']['value']
+        return self.name_reconstruction(name, stats['format']['value'])
+
+    def row(self, name, stats = None):
+        '''
+            RecycleView data entry for the stored track `name`
+        '''
+        stats     = stats or self.storage[name]
+        file_name = self.track_file(name, stats)
+        return \
+        {
+            'txt':        file_name,
+            'stats':      stats,
+            'track_path': os.path.join(self.folder, file_name),
+            'cache_path': thumbnail_path(self.thumbnails, file_name),
+            'item_press': self.on_press
+        }
+
+    def placeholder(self, track, mtime_ns):
+        '''
+            RecycleView data entry for a track still being indexed (no stats, no thumbnail)
+        '''
+        return \
+        {
+            'txt':        track,
+            'stats':      {'mtime': {'value': mtime_ns / 1e9}},
+            'track_path': os.path.join(self.folder, track),
+            'cache_path': '',
+            'item_press': self.on_press
+        }
+
     def show(self):
-        self.list.clear_widgets()
-        storaged        = [{'name': name, 'mtime': self.storage[name]['mtime']['value']} for name in self.storage]
-        storaged_sorted = sorted(storaged, key = lambda d: d['mtime'], reverse = True)
+        self.list.data = [self.row(name, stats) for name, stats in self.stored()]
 
-        for d in storaged_sorted:
-            name      = d['name']
-            stats     = self.storage[name]
-            format    = stats['format']['value']
-            file_name = self.name_reconstruction(name, format)
-            self.list.add_widget(ListItem(txt = file_name, stats = stats, item_press = self.on_press))
+    def show_insert(self, track, row = None):
+        '''
+            Insert the row of `track` (stored one by default) keeping the newest-first order
+        '''
+        try:
+            row   = row or self.row(self.name_extraction(track)[0])
+            keys  = [-d['stats']['mtime']['value'] for d in self.list.data]
+            index = bisect_left(keys, -row['stats']['mtime']['value'])
+            self.list.data.insert(index, row)
+
+        except Exception as e:
+            print('[TRACK]', f"File {track} couldn't be shown: {e}")
+
+    def show_remove(self, track):
+        '''
+            Remove the row of `track`, if shown
+        '''
+        for index, d in enumerate(self.list.data):
+            if d['txt'] == track:
+                del self.list.data[index]
+                break
+
+    def show_redraw(self, track):
+        '''
+            Redraw the thumbnail of `track` if its row is visible: a rewritten track keeps
+            its paths, so the recycled row sees no change of its own
+        '''
+        for item in self.list.layout_manager.children:
+            if item.txt == track:
+                item.map.trigger_draw()
 
     def download(self, track):
         try:
             track_path = os.path.join(self.folder, track)
+            export     = track_base(track)  # compressed tracks are exported as plain GPX / CSV
             if platform == 'android':
                 SDK_INT = int(Build_VERSION.SDK_INT)
 
                 if 23 <= SDK_INT <= 29 and not check_permission(Permission.WRITE_EXTERNAL_STORAGE):
                     track_storage = None
                 else:
-                    track_storage = self.ss.copy_to_shared(track_path, collection = self.Environment.DIRECTORY_DOWNLOADS, filepath = track) # copy to shared dir download/<app_name>/<track>
-                    track_display = f'{self.Environment.DIRECTORY_DOWNLOADS}/{app_name}/{track}'
+                    # Shared storage copies a file as-is, so a compressed track is expanded next to it first
+                    export_path = track_path if export == track else os.path.join(self.folder, f'{export}.export')
+                    if export_path != track_path:
+                        self.export_copy(track_path, export_path)
+
+                    try:
+                        track_storage = self.ss.copy_to_shared(export_path, collection = self.Environment.DIRECTORY_DOWNLOADS, filepath = export) # copy to shared dir download/<app_name>/<track>
+                        track_display = f'{self.Environment.DIRECTORY_DOWNLOADS}/{app_name}/{export}'
+                    finally:
+                        if export_path != track_path:
+                            os.remove(export_path)
 
             else:
-                track_storage = os.path.join(working_path, track)
+                track_storage = os.path.join(working_path, export)
                 track_display = track_storage
-                with open(track_path, 'r', encoding = 'utf-8') as src, open(track_storage, 'w', encoding = 'utf-8') as dst:
-                    source = src.read() # read the whole file at once
-                    dst.write(source)
+                self.export_copy(track_path, track_storage)
 
 
             print('[TRACK]', f'Track copied: {track} -> {track_storage}')
@@ -305,6 +443,13 @@ class TracksScreen(MDScreen, Saver):
             print('[TRACK]', f"File {track} couldn't be downloaded: {e}")
             toast(f"{track} couldn't be downloaded")
 
+    def export_copy(self, track_path, export_path):
+        '''
+            Stream a track to `export_path` in fixed-size chunks, gzip-compressed tracks decompressed
+        '''
+        with open_track(track_path, newline = '') as src, open(export_path, 'w', encoding = 'utf-8', newline = '') as dst:
+            shutil.copyfileobj(src, dst, copy_chunk_size)
+
     def stats(self, track):
         try:
             track_name  = self.name_extraction(track)[0]
@@ -321,7 +466,7 @@ class TracksScreen(MDScreen, Saver):
                 f"max. speed: {track_stats['speed_max']['value']} {track_stats['speed_max']['unit']}\n"
                 f"avg. speed: {track_stats['speed_avg']['value']} {track_stats['speed_avg']['unit']}"
             )
-            if track.endswith('.gpx'):
+            if track_base(track).endswith('.gpx'):
                 text = f"\nversion: {track_stats['version']['value']} {text}"
             return text
 
@@ -344,7 +489,10 @@ class TracksScreen(MDScreen, Saver):
             self.download(self.track)
         else:
             self.track = btn.children[0].children[0].children[0].text
-            self.stats_pop(self.track)
+            if self.name_extraction(self.track)[0] in self.storage:
+                self.stats_pop(self.track)
+            else:
+                toast(f'{self.track} is being indexed')
 
     def on_size(self, *args):
         self.mock_banner.update_banner_height()
@@ -0,0 +1,192 @@
+import os
+import multiprocessing
+
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from kivy       import platform
+from kivy.clock import Clock
+from config     import points_limit, simplify_oversample, simplify_tolerance, index_workers, rebuild_workers
+
+from lib.gpx.simplify     import visvalingam
+from lib.utils.paths      import open_track, track_base
+from lib.utils.thumbnails import track_fingerprint, save_thumbnail, remove_thumbnail
+
+from lib.gpx.csv_stat_parser import read_csv_track, read_csv_statistics
+from lib.gpx.gpx_stat_parser import read_gpx_track, read_gpx_statistics
+
+
+def index_track(track_path, cache_path):
+    '''
+        Parse a finished track: return its storage entry (scalar stats) and
+        write the simplified thumbnail to `cache_path`. Touches no UI or store,
+        so it can run in a worker.
+    '''
+    track          = os.path.basename(track_path)
+    mtime_ns, size = track_fingerprint(track_path)
+
+    with open_track(track_path) as f:
+        # Statistics from the comment header only
+        if track_base(track).endswith('.csv'):
+            stats      = read_csv_statistics(f)
+            read_track = read_csv_track
+            format     = 'csv'
+        else:
+            stats      = read_gpx_statistics(f)
+            read_track = read_gpx_track
+            format     = 'gpx'
+
+        # Stream an oversampled columnar track, then simplify it for the thumbnail
+        points_total   = stats['track_points']['value']
+        step           = max(1, points_total // (points_limit * simplify_oversample))
+        f.seek(0)
+        points_to_show = visvalingam(read_track(f, step), points_limit, simplify_tolerance)
+
+    track_data = \
+    {
+        'file':           {'value': track},
+        'mtime':          {'value': mtime_ns / 1e9},
+        'mtime_ns':       {'value': mtime_ns},
+        'size':           {'value': size},
+        'format':         {'value': format},
+        'units':          {'value': stats['units']['value']},
+        'points':         {'value': stats['track_points']['value']},
+        'duration':       {'value': stats['duration']['value']},
+        'distance':       {
+                              'value': stats['distance']['value'],
+                              'unit':  stats['distance']['unit']
+                          },
+        'altitude_gap':   {
+                              'value': stats['net_elevation_change']['value'],
+                              'unit':  stats['net_elevation_change']['unit']
+                          },
+        'speed_max':      {
+                              'value': stats['speed_max']['value'],
+                              'unit':  stats['speed_max']['unit']
+                          },
+        'speed_avg':      {
+                              'value': stats['speed_avg']['value'],
+                              'unit':  stats['speed_avg']['unit']
+                          }
+    }
+    if format == 'gpx':
+        track_data.update({'version': {'value': stats['version']['value']}})
+
+    # Thumbnail goes to the binary cache (stale rendered textures dropped), the store keeps scalar stats only
+    remove_thumbnail(cache_path)
+    save_thumbnail(track_path, cache_path, points_to_show)
+
+    return track_data
+
+
+def index_tracks(jobs, workers = rebuild_workers):
+    '''
+        Index many tracks in parallel, `jobs` is {track: (track_path, cache_path)}.
+
+        Parsing is spread over a process pool (one process per core by default).
+        The workers are spawned, not forked: this runs on a worker thread of the
+        Kivy/GL process, whose threads and GL state a fork would copy half-way.
+        Android (no sem_open) and other platforms without working multiprocessing
+        use threads. Return ({track: track_data}, {track: error}).
+    '''
+    try:
+        if platform == 'android':
+            raise NotImplementedError('no multiprocessing on Android')
+        executor = ProcessPoolExecutor(max_workers = workers, mp_context = multiprocessing.get_context('spawn'))
+    except (ImportError, OSError, NotImplementedError) as e:
+        print('[INDEXER]', f'Process pool unavailable, using threads: {e}')
+        executor = ThreadPoolExecutor(max_workers = workers or index_workers)
+
+    results, errors = {}, {}
+    with executor:
+        futures = {track: executor.submit(index_track, *paths) for track, paths in jobs.items()}
+        for track, future in futures.items():
+            try:
+                results[track] = future.result()
+            except Exception as e:
+                errors[track]  = e
+
+    return results, errors
+
+
+class Indexer:
+    '''
+        Background track indexing.
+
+        `index_track` runs in a small thread pool; the result (or error) is
+        handed back to `callback(track, track_data, error)` on the Kivy main
+        thread through `Clock.schedule_once`, so the store and the widgets are
+        only touched from there. A cancelled job never reaches the callback and
+        its thumbnail is removed.
+    '''
+    def __init__(self, workers = index_workers):
+        self.executor = ThreadPoolExecutor(max_workers = workers, thread_name_prefix = 'indexer')
+        self.jobs       = {}     # track -> (future, cache_path)
+        self.rebuilding = set()  # tracks of a running rebuild
+
+    def pending(self):
+        return self.jobs.keys() | self.rebuilding
+
+    def submit(self, track, track_path, cache_path, callback):
+        '''
+            Index `track` in the background, replacing a pending job for the same track
+        '''
+        self.cancel(track, clean = False)
+
+        future           = self.executor.submit(index_track, track_path, cache_path)
+        self.jobs[track] = (future, cache_path)
+        future.add_done_callback(lambda future: Clock.schedule_once(lambda dt: self.done(track, future, callback)))
+        print('[INDEXER]', f'{track} queued')
+
+    def done(self, track, future, callback):
+        job = self.jobs.get(track)
+        if job is None or job[0] is not future:
+            return  # cancelled or superseded, the cancel already cleaned up
+
+        del self.jobs[track]
+        try:
+            callback(track, future.result(), None)
+        except Exception as e:
+            callback(track, None, e)
+
+    def rebuild(self, jobs, callback):
+        '''
+            Run `index_tracks(jobs)` in the background, `callback(results, errors)` on the main thread
+        '''
+        for track in jobs:
+            self.cancel(track, clean = False)
+
+        self.rebuilding |= jobs.keys()
+        future = self.executor.submit(index_tracks, jobs)
+        future.add_done_callback(lambda future: Clock.schedule_once(lambda dt: self.rebuilt(jobs, future, callback)))
+        print('[INDEXER]', f'Rebuilding the index of {len(jobs)} tracks')
+
+    def rebuilt(self, jobs, future, callback):
+        self.rebuilding -= jobs.keys()
+        try:
+            results, errors = future.result()
+        except Exception as e:
+            results, errors = {}, {track: e for track in jobs}
+        callback(results, errors)
+
+    def cancel(self, track, clean = True):
+        '''
+            Forget the job of `track`; a running parse finishes but its result is dropped
+            (and its thumbnail removed with `clean`)
+        '''
+        job = self.jobs.pop(track, None)
+        if job is None:
+            return
+
+        future, cache_path = job
+        if not future.cancel() and clean:
+            # Already running: clean the thumbnail once the worker is done with it
+            future.add_done_callback(lambda future: remove_thumbnail(cache_path))
+        print('[INDEXER]', f'{track} cancelled')
+
+    def shutdown(self):
+        '''
+            Cancel every job and stop the pool without waiting for running parses
+        '''
+        for track in list(self.jobs):
+            self.cancel(track)
+        self.executor.shutdown(wait = False, cancel_futures = True)
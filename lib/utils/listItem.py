@@ -13,6 +13,10 @@ class ListItem(BaseListItem):
     '''
         A custom list item widget that displays a map thumbnail and a label inside a card.
 
+        The item is used as a `RecycleView` view class: its properties are
+        reassigned when the view is recycled for another track, and the
+        child widgets follow them.
+
         This widget is designed for use in lists of tracks or similar data, where each
         entry includes:
         - A small map preview (`Map`)
@@ -22,12 +26,15 @@ class ListItem(BaseListItem):
         Attributes:
             txt (StringProperty): The main text to display in the label.
             item_press (ObjectProperty): Callback function to execute when the card is pressed.
-            stats (DictProperty): Dictionary containing data for the item, such as
-                ``points_to_show`` (a list of coordinates for the map thumbnail).
+            stats (DictProperty): Dictionary containing scalar statistics for the item.
+            track_path (StringProperty): Track file the thumbnail belongs to.
+            cache_path (StringProperty): Binary thumbnail cache, loaded lazily by the map.
     '''
     txt        = StringProperty(None)
     item_press = ObjectProperty(None)
     stats      = DictProperty({})
+    track_path = StringProperty('')
+    cache_path = StringProperty('')
 
     def __init__(self, **kwargs):
         '''
@@ -38,16 +45,19 @@ class ListItem(BaseListItem):
         self.divider = None
         self.height  = dp(80)
 
+        self.map   = Map(track_path = self.track_path, cache_path = self.cache_path, size_hint = [0.25, 1])
+        self.label = CustomLabel(text = self.txt or '', size_hint = [1, 0.5])
+
         self.add_widget \
         (
             MDCard
             (
             MDBoxLayout
                 (
-                    Map(points_to_show = self.stats['points_to_show']['value'], size_hint = [0.25, 1]),
+                    self.map,
                     MDBoxLayout
                     (
-                        CustomLabel(text = self.txt, size_hint = [1, 0.5]),
+                        self.label,
                         orientation = 'vertical',
                         spacing     = dp(0),
                         padding     = [dp(10), dp(0), dp(5), dp(0)]
@@ -55,7 +65,7 @@ class ListItem(BaseListItem):
                     spacing = dp(0),
                     padding = [dp(12), dp(0), dp(0), dp(0)]
                 ),
-                on_press  = self.item_press,
+                on_press  = self.on_card_press,
                 pos_hint  = {'x': 0, 'y': 0.05},
                 size_hint = [1, 0.95],
                 elevation = 1,
@@ -63,3 +73,19 @@ class ListItem(BaseListItem):
             )
 
         )
+
+    def on_card_press(self, card):
+        if self.item_press:
+            self.item_press(card)
+
+    def on_txt(self, instance, value):
+        if hasattr(self, 'label'):
+            self.label.text = value or ''
+
+    def on_track_path(self, instance, value):
+        if hasattr(self, 'map'):
+            self.map.track_path = value
+
+    def on_cache_path(self, instance, value):
+        if hasattr(self, 'map'):
+            self.map.cache_path = value
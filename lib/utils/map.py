@@ -1,10 +1,25 @@
-from kivy.graphics   import Color, Line
-from kivy.properties import ListProperty
+import os
+
+from kivy.cache      import Cache
+from kivy.clock      import Clock
+from kivy.core.image import Image as CoreImage
+from kivy.graphics   import Color, Fbo, Line, Rectangle, ClearColor, ClearBuffers
+from kivy.properties import NumericProperty, ObjectProperty, StringProperty
 
 from kivymd.material_resources   import dp
 from kivymd.theming_dynamic_text import get_contrast_text_color
 from kivymd.uix.widget           import MDWidget
 
+from lib.gpx.track        import Track
+from lib.utils.thumbnails import load_thumbnail, track_fingerprint
+
+
+# Rendered thumbnail textures shared by all maps
+Cache.register('map.textures', limit = 256)
+
+# Texture sizes are rounded up to this bucket (px)
+texture_bucket = 32
+
 
 class Map(MDWidget):
     '''
@@ -15,59 +30,184 @@ class Map(MDWidget):
         to the current theme.
 
         Attributes:
-            points_to_show (ListProperty): A list of dictionaries containing
-                geographic coordinates with keys ``'lat'`` and ``'lon'``.
-                Example: ``[{"lat": 50.1, "lon": 8.6}, {"lat": 50.2, "lon": 8.7}]``
+            points_to_show (ObjectProperty): A columnar `Track` with ``lat`` and
+                ``lon`` columns (its ``to_dict`` form or a legacy list of
+                ``{'lat', 'lon'}`` dicts is converted on assignment).
+            track_path (StringProperty): Track file of the thumbnail cache.
+            cache_path (StringProperty): Binary thumbnail cache, loaded on first draw
+                when `points_to_show` is not set. When set, the polyline is
+                rendered once per size bucket and theme into a PNG next to
+                the cache and later draws only display that texture.
     '''
-    points_to_show = ListProperty([])
+    points_to_show = ObjectProperty(None, allownone = True)
+    track_path     = StringProperty('')
+    cache_path     = StringProperty('')
+    padding        = NumericProperty(dp(10))
 
     def __init__(self, **kwargs):
         '''
             Initialize the map widget and bind it to theme changes.
         '''
-        super().__init__(**kwargs)
+        # Nothing is drawn before the layout sizes the widget (the default size would render
+        # a texture of its own), later draws are coalesced into one per frame
+        self.laid_out     = False
+        self.trigger_draw = Clock.create_trigger(self.redraw)
 
-        self.padding = dp(10)
+        # Track file (mtime_ns, size) the cached points were loaded for
+        self.points_fingerprint = None
+
+        super().__init__(**kwargs)
 
         # Bind to theme changes - bind to the actual properties that change
         self.theme_cls.bind(theme_style = self._update_colors)
         self._update_colors()
 
+    def on_points_to_show(self, instance, value):
+        '''
+            Convert stored thumbnail data into a `Track`.
+        '''
+        if value is not None and not isinstance(value, Track):
+            self.points_to_show = Track.from_dict(value)
+
     def on_size(self, *args):
         '''
-            Redraw the polyline when the widget is resized.
+            Redraw the thumbnail when the widget is resized.
         '''
+        self.laid_out = True
+        self.trigger_draw()
+
+    def on_pos(self, *args):
+        '''
+            Redraw the thumbnail when the widget is moved (recycled list rows).
+        '''
+        self.laid_out = True
+        self.trigger_draw()
+
+    def on_cache_path(self, *args):
+        '''
+            Drop the loaded points and redraw when the map is reused for another track.
+        '''
+        self.points_to_show     = None
+        self.points_fingerprint = None
+        self.trigger_draw()
+
+    def redraw(self, *args):
+        '''
+            Replace the drawn thumbnail (a pending trigger coalesces resize, move and theme changes).
+        '''
+        if not self.laid_out:
+            return
+
         self.canvas.after.clear()
         self.draw_line()
 
     def draw_line(self):
         '''
-            Normalize coordinates and draw a line connecting all points
+            Draw the thumbnail: a cached texture if available, otherwise
+            normalize coordinates and draw a line connecting all points
             from `points_to_show`.
         '''
 
         try:
-            lons = [float(point['lon']) for point in self.points_to_show]
-            lats = [float(point['lat']) for point in self.points_to_show]
+            path = self.texture_path()
+            if path:
+                texture = self.texture_load(path) or self.texture_render(path)
+                if texture is not None:
+                    self.add_texture(texture)
+                    return
+
+            self.load_points()
+            if self.points_to_show is None:
+                return
+
+            points = self.points_to_show.normalize \
+            (
+                self.pos[0] + self.padding,
+                self.pos[1] + self.padding,
+                self.width  - 2 * self.padding,
+                self.height - 2 * self.padding
+            )
+            self.add_line(points)
 
-            min_lon, max_lon = min(lons), max(lons)
-            min_lat, max_lat = min(lats), max(lats)
+        except Exception as e:
+            print('[MAP]', f'Error drawing map: {e}')
 
-            points = []
-            for point in self.points_to_show:
-                lon = float(point['lon'])
-                lat = float(point['lat'])
+    def load_points(self):
+        '''
+            Load the points from the thumbnail cache, again once the track file was rewritten
+        '''
+        if not self.cache_path:
+            return
 
-                x = self.lon_norm(lon, min_lon, max_lon, self.width  - 2 * self.padding) + self.pos[0] + self.padding
-                y = self.lat_norm(lat, min_lat, max_lat, self.height - 2 * self.padding) + self.pos[1] + self.padding
+        fingerprint = track_fingerprint(self.track_path) if os.path.exists(self.track_path) else None
+        if self.points_fingerprint is not None and self.points_fingerprint != fingerprint:
+            self.points_to_show = None
 
-                points.append(x)
-                points.append(y)
+        if self.points_to_show is None:
+            self.points_to_show     = load_thumbnail(self.track_path, self.cache_path)
+            self.points_fingerprint = fingerprint
 
-            self.add_line(points)
+    def texture_size(self):
+        return \
+        [
+            max(texture_bucket, -(-int(self.width)  // texture_bucket) * texture_bucket),
+            max(texture_bucket, -(-int(self.height) // texture_bucket) * texture_bucket)
+        ]
 
-        except Exception as e:
-            print('[MAP]', f'Error drawing map: {e}')
+    def texture_path(self):
+        '''
+            PNG path keyed by track fingerprint, theme and size bucket (None without a cache)
+        '''
+        if not self.cache_path or not os.path.exists(self.track_path):
+            return None
+
+        mtime_ns, size = track_fingerprint(self.track_path)
+        width, height  = self.texture_size()
+        return f'{self.cache_path}.{mtime_ns}-{size}.{self.theme_cls.theme_style.lower()}.{width}x{height}.png'
+
+    def texture_load(self, path):
+        texture = Cache.get('map.textures', path)
+        if texture is None and os.path.exists(path):
+            texture = CoreImage(path).texture
+            Cache.append('map.textures', path, texture)
+        return texture
+
+    def texture_render(self, path):
+        '''
+            Render the polyline offscreen once and save it as PNG.
+        '''
+        self.load_points()
+        if self.points_to_show is None:
+            return None
+
+        width, height = self.texture_size()
+        points = self.points_to_show.normalize \
+        (
+            self.padding,
+            self.padding,
+            width  - 2 * self.padding,
+            height - 2 * self.padding
+        )
+
+        fbo = Fbo(size = (width, height))
+        with fbo:
+            ClearColor(0, 0, 0, 0)
+            ClearBuffers()
+            Color(*get_contrast_text_color(self.theme_cls.bg_dark))
+            Line(points = points, width = dp(1.2))
+        fbo.draw()
+
+        fbo.texture.save(path)
+        Cache.append('map.textures', path, fbo.texture)
+        print('[MAP]', f'Thumbnail rendered: {os.path.basename(path)}')
+        return fbo.texture
+
+    def add_texture(self, texture):
+        '''
+            Display a pre-rendered thumbnail texture over the whole widget.
+        '''
+        self.canvas.after.add(Color(1, 1, 1, 1))
+        self.canvas.after.add(Rectangle(texture = texture, pos = self.pos, size = self.size))
 
     def add_line(self, points):
         '''
@@ -80,23 +220,10 @@ class Map(MDWidget):
         self.canvas.after.add(color)
         self.canvas.after.add(line)
 
-    def lon_norm(self, lon, min_lon, max_lon, width):
-        if max_lon == min_lon:
-            return width / 2
-        else:
-            return (lon - min_lon) / (max_lon - min_lon) * width
-
-    def lat_norm(self, lat, min_lat, max_lat, height):
-        if max_lat == min_lat:
-            return height / 2
-        else:
-            return (lat - min_lat) / (max_lat - min_lat) * height
-
     def _update_colors(self, *args):
         '''
             Update widget background color and redraw the line.
         '''
         # Update background color
         self.md_bg_color = self.theme_cls.bg_dark
-        self.canvas.after.clear()
-        self.draw_line()
+        self.trigger_draw()
@@ -1,45 +1,36 @@
 import os
+import gzip
 import json
 
-from kivy                   import platform
-from kivy.storage.jsonstore import JsonStore
+from kivy import platform
 
 from config import default_settings
 
+from lib.utils.settingsChannel import SettingsStore
+from lib.utils.trackStore      import TrackStore
 
-gnss_log         = 'gnss_log.json'
-settings_json    = 'settings.json'
-track_stats_json = 'track_stats.json'
-tracks_folder    = 'tracks'
-working_path     = os.getcwd()
+
+gnss_socket       = 'gnss.sock'
+gnss_ring         = 'gnss_ring.bin'
+settings_json     = 'settings.json'
+track_stats_json  = 'track_stats.json'
+track_stats_db    = 'track_stats.db'
+tracks_folder     = 'tracks'
+thumbnails_folder = 'thumbnails'
+checkpoint_ext    = '.checkpoint'
+compressed_ext    = '.gz'
+track_exts        = ('.gpx', '.csv', '.gpx.gz', '.csv.gz')
+working_path      = os.getcwd()
 
 
 def check_path(path, file, path_only = False):
     path_join = os.path.join(path, file)
 
     try:
-        # GNSS
-        if file == gnss_log:
-            if path_only:
-                print('[PATHS]', f'Gnss log path: {path_join}')
-                return path_join # Returns path
-
-            else:
-                if not os.path.exists(path_join):
-                    with open(path_join, 'w', encoding = 'utf-8') as f:
-                        json.dump({}, f)
-                        print('[PATHS]', f'Created new gnss_log log: {path_join}')
-                else:
-                    with open(path_join, 'r', encoding = 'utf-8') as f:
-                        content = f.read().strip()
-                    content_dict = json.loads(content)
-                    if content_dict != {}:
-                        with open(path_join, 'w', encoding = 'utf-8') as f:
-                            json.dump({}, f)
-                        print('[PATHS]', f'Log is not empty, new gnss_log log created: {path_join}')
-
-                print('[PATHS]', f'Using gnss_log log on path: {path_join}')
-                return path_join
+        # GNSS LIVE POINTS
+        if file == gnss_socket or file == gnss_ring:
+            print('[PATHS]', f'Gnss live points path: {path_join}')
+            return path_join # Returns path (socket bound by the display, ring created by the service)
 
         # SETTINGS
         if file == settings_json:
@@ -53,23 +44,33 @@ def check_path(path, file, path_only = False):
                         json.dump(default_settings, f)
                         print('[PATHS]', f'Created new settings file: {path_join}')
 
+                store = SettingsStore(path_join, indent = 2)
+
+                # Settings added since the file was written
+                for key, value in default_settings.items():
+                    if not store.exists(key):
+                        store.put(key, **value)
+                        print('[PATHS]', f'Added missing setting: {key}')
+
                 print('[PATHS]', f'Using settings store on: {path_join}')
-                return JsonStore(path_join, indent = 2)  # Returns store
+                return store  # Returns store, notifies the service on writes
 
-        # TRACK STATS
-        if file == track_stats_json:
+        # TRACK CATALOGUE
+        if file == track_stats_db:
             if path_only:
-                print('[PATHS]', f'Track stats path: {path_join}')
+                print('[PATHS]', f'Track catalogue path: {path_join}')
                 return path_join # Returns path
 
             else:
-                if not os.path.exists(path_join):
-                    with open(path_join, 'w', encoding = 'utf-8') as f:
-                        json.dump({}, f)
-                        print('[PATHS]', f'Created new track stats file: {path_join}')
+                store = TrackStore(path_join)
+
+                # One-time import of the JsonStore catalogue
+                legacy_path = os.path.join(path, track_stats_json)
+                if os.path.exists(legacy_path):
+                    store.migrate_json(legacy_path)
 
-                print('[PATHS]', f'Using track stats store on: {path_join}')
-                return JsonStore(path_join, indent = 2)  # Returns store
+                print('[PATHS]', f'Using track catalogue on: {path_join}')
+                return store  # Returns store
 
         # TRACK FOLDER
         if file == tracks_folder:
@@ -85,6 +86,20 @@ def check_path(path, file, path_only = False):
                 print('[PATHS]', f'Using tracks folder path: {path_join}')
                 return path_join # Returns path
 
+        # THUMBNAILS FOLDER
+        if file == thumbnails_folder:
+            if path_only:
+                print('[PATHS]', f'Thumbnails folder path: {path_join}')
+                return path_join  # Returns path
+
+            else:
+                if not os.path.exists(path_join):
+                    os.makedirs(path_join)
+                    print('[PATHS]', f'New thumbnails folder created: {path_join}')
+
+                print('[PATHS]', f'Using thumbnails folder path: {path_join}')
+                return path_join # Returns path
+
     except Exception as e:
         print('[PATHS]', f'Error loading from {path_join}: {e}')
         raise  # re-raise so caller can handle fallback
@@ -106,5 +121,21 @@ def load_path(file, path_only = False):
         print('[PATHS]', f'Storage not available. Using defaults only: {e}')
         if file == settings_json:
             return default_settings
-        elif file == track_stats_json:
+        elif file == track_stats_db:
             return {}
+
+
+def track_base(track):
+    '''
+        Track file name without the compression extension ('a.gpx.gz' -> 'a.gpx')
+    '''
+    return track[:-len(compressed_ext)] if track.endswith(compressed_ext) else track
+
+
+def open_track(track_path, mode = 'r', newline = None):
+    '''
+        Open a finished track as text, gzip-compressed tracks transparently
+    '''
+    if track_path.endswith(compressed_ext):
+        return gzip.open(track_path, f'{mode}t', encoding = 'utf-8', newline = newline)
+    return open(track_path, mode, encoding = 'utf-8', newline = newline)
@@ -0,0 +1,160 @@
+import os
+import math
+import time
+import socket
+import struct
+import threading
+
+from kivy.clock import Clock
+
+
+# Frame: lat, lon, alt, speed, accuracy, bearing (NaN if missing), fix time (ms UTC), satellites, send time (ns), provider
+point_frame = struct.Struct('<ddddddqiq8s')
+
+point_floats = ('latitude', 'longitude', 'altitude_m', 'speed_mps', 'accuracy_m', 'bearing_deg')
+
+
+def pack_point(point, sent_ns = 0, buffer = None, offset = 0):
+    '''
+        Encode a point dict as a fixed-size frame, into `buffer` at `offset` if given
+    '''
+    values = [math.nan if point.get(key) is None else point[key] for key in point_floats]
+    fix_ms = point.get('time_ms_utc')
+    sats   = point.get('satellites_used_in_fix')
+    values.append(-1 if fix_ms is None else fix_ms)
+    values.append(-1 if sats is None else sats)
+    values.append(sent_ns)
+    values.append((point.get('provider') or '').encode('utf-8')[:8])
+
+    if buffer is None:
+        return point_frame.pack(*values)
+    point_frame.pack_into(buffer, offset, *values)
+
+
+def unpack_point(buffer, offset = 0):
+    '''
+        Decode a frame, return (point dict, send time in ns)
+    '''
+    *floats, fix_ms, sats, sent_ns, provider = point_frame.unpack_from(buffer, offset)
+
+    point = {key: None if value != value else value for key, value in zip(point_floats, floats)}
+    point['time_ms_utc']            = None if fix_ms == -1 else fix_ms
+    point['satellites_used_in_fix'] = None if sats == -1 else sats
+    point['provider']               = provider.rstrip(b'\0').decode('utf-8', errors = 'ignore')
+    return point, sent_ns
+
+
+class LatencyStats:
+    '''
+        Rolling fix-to-display latency, logged every `every` points
+    '''
+    def __init__(self, tag, every = 10):
+        self.tag   = tag
+        self.every = every
+        self.reset()
+
+    def reset(self):
+        self.count       = 0
+        self.fix_sum     = 0
+        self.fix_max     = 0
+        self.channel_sum = 0
+        self.channel_max = 0
+
+    def add(self, point, sent_ns):
+        '''
+            Fix age (GNSS time -> now) and channel delay (service send -> now), both in ms
+        '''
+        now_ns = time.time_ns()
+        fix    = now_ns / 1e6 - point['time_ms_utc'] if point.get('time_ms_utc') else 0
+        delay  = (now_ns - sent_ns) / 1e6 if sent_ns else 0
+
+        self.count       += 1
+        self.fix_sum     += fix
+        self.fix_max      = max(self.fix_max, fix)
+        self.channel_sum += delay
+        self.channel_max  = max(self.channel_max, delay)
+
+        if self.count >= self.every:
+            print \
+            (
+                self.tag,
+                f'latency over {self.count} fixes: '
+                f'fix -> display avg {self.fix_sum / self.count:.1f} ms, max {self.fix_max:.1f} ms; '
+                f'service -> display avg {self.channel_sum / self.count:.1f} ms, max {self.channel_max:.1f} ms'
+            )
+            self.reset()
+
+
+class PointChannel:
+    '''
+        Live point channel from the GNSS service to the display.
+
+        The display binds a UNIX datagram socket and a daemon thread blocks on
+        it; every fix arrives as one `point_frame` and is handed to the
+        callback on the Kivy main thread. The service sends one datagram per
+        fix, dropped silently while no display listens. Without AF_UNIX
+        (`available` is False) the display polls the `PointRing` instead.
+    '''
+    available = hasattr(socket, 'AF_UNIX')
+
+    def __init__(self, path):
+        self.path   = path
+        self.sock   = None
+        self.thread = None
+
+    def listen(self, callback):
+        '''
+            Bind the socket and start delivering points to `callback(point, sent_ns)`
+        '''
+        if not self.available or self.path is None:
+            return False
+
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)  # left by a killed app
+
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            self.sock.bind(self.path)
+
+            self.thread = threading.Thread(target = self.receive, args = (callback,), daemon = True)
+            self.thread.start()
+            print('[CHANNEL]', f'Listening for points on: {self.path}')
+            return True
+
+        except Exception as e:
+            print('[CHANNEL]', f'Point socket unavailable, using the gnss log: {e}')
+            self.sock = None
+            return False
+
+    def receive(self, callback):
+        sock = self.sock
+        while self.sock is not None:
+            try:
+                frame = sock.recv(point_frame.size)
+            except OSError:
+                break  # closed
+
+            if len(frame) == point_frame.size:
+                point, sent_ns = unpack_point(frame)
+                Clock.schedule_once(lambda dt, point = point, sent_ns = sent_ns: callback(point, sent_ns))
+
+    def send(self, point):
+        '''
+            Send a fix; False only if the channel can't exist here (use the file fallback)
+        '''
+        if not self.available or self.path is None:
+            return False
+
+        try:
+            if self.sock is None:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                self.sock.setblocking(False)  # never stall the service on a busy display
+            self.sock.sendto(pack_point(point, time.time_ns()), self.path)
+        except OSError:
+            pass  # no display listening, or its queue is full
+        return True
+
+    def close(self):
+        sock, self.sock = self.sock, None
+        if sock is not None:
+            sock.close()
@@ -0,0 +1,145 @@
+import os
+import mmap
+import struct
+
+from config                 import ring_size
+from lib.utils.pointChannel import point_frame, pack_point, unpack_point
+
+
+# Header: magic, record size, capacity, writer sequence (records ever written, 8-byte aligned)
+ring_header = struct.Struct('<4sII4xQ')
+ring_magic  = b'RNG1'
+ring_offset = 64  # records start on their own cache line
+
+
+class PointRing:
+    '''
+        Memory-mapped ring buffer of the last `capacity` fixes.
+
+        The service appends every fix as a fixed `point_frame` record and then
+        bumps the sequence in the header; the display maps the same file
+        read-only and reads records straight from the mapping, no file reads
+        and no JSON. A reader copes with the writer lapping it by re-checking
+        the sequence after reading and dropping records overwritten meanwhile.
+    '''
+    def __init__(self, path, capacity = ring_size, writer = False):
+        self.path     = path
+        self.capacity = capacity
+        self.writer   = writer
+        self.size     = ring_offset + capacity * point_frame.size
+        self.mm       = None
+        self.inode    = None
+
+    def open(self):
+        '''
+            Map the ring file, created by the writer, return False if not available (yet)
+        '''
+        if self.mm is not None:
+            return True
+
+        try:
+            if self.writer:
+                self.create()
+                with open(self.path, 'r+b') as f:
+                    self.mm = mmap.mmap(f.fileno(), self.size)
+            else:
+                with open(self.path, 'rb') as f:
+                    magic, record_size, capacity, _ = ring_header.unpack(f.read(ring_header.size))
+                    if magic != ring_magic or record_size != point_frame.size:
+                        return False
+                    self.capacity = capacity
+                    self.size     = ring_offset + capacity * record_size
+                    self.mm       = mmap.mmap(f.fileno(), self.size, access = mmap.ACCESS_READ)
+            self.inode = os.stat(self.path).st_ino
+            return True
+
+        except (OSError, ValueError, struct.error) as e:
+            if self.writer:
+                print('[RING]', f'Ring buffer not available: {e}')
+            self.mm = None
+            return False
+
+    def create(self):
+        '''
+            Keep an existing ring of the same layout (sequence continues), otherwise replace it
+        '''
+        try:
+            with open(self.path, 'rb') as f:
+                magic, record_size, capacity, _ = ring_header.unpack(f.read(ring_header.size))
+            if (magic, record_size, capacity) == (ring_magic, point_frame.size, self.capacity) and os.path.getsize(self.path) == self.size:
+                return
+        except (OSError, struct.error):
+            pass
+
+        # New inode, so a reader still mapping the old file never sees it shrink
+        ring_temp = f'{self.path}.tmp'
+        with open(ring_temp, 'wb') as f:
+            f.write(ring_header.pack(ring_magic, point_frame.size, self.capacity, 0))
+            f.truncate(self.size)
+        os.replace(ring_temp, self.path)
+        print('[RING]', f'Ring buffer created: {self.capacity} fixes, {self.size} B')
+
+    def reopen(self):
+        '''
+            Re-map if the writer replaced the file (reader side)
+        '''
+        try:
+            if self.mm is not None and os.stat(self.path).st_ino == self.inode:
+                return True
+        except OSError:
+            return False
+
+        self.close()
+        return self.open()
+
+    @property
+    def sequence(self):
+        if self.mm is None and not self.open():
+            return 0
+        return ring_header.unpack_from(self.mm)[3]
+
+    def append(self, point, sent_ns = 0):
+        '''
+            Write the fix into the next slot, then publish it by bumping the sequence (writer side)
+        '''
+        if self.mm is None and not self.open():
+            return
+
+        sequence = ring_header.unpack_from(self.mm)[3]
+        pack_point(point, sent_ns, self.mm, ring_offset + (sequence % self.capacity) * point_frame.size)
+        struct.pack_into('<Q', self.mm, ring_header.size - 8, sequence + 1)
+
+    def read(self, since = 0, limit = None):
+        '''
+            Return ([(point, sent_ns)], sequence) for the records after `since`, oldest first.
+            The oldest slot is the next one written, so up to capacity - 1 records come back.
+        '''
+        sequence = self.sequence
+        if self.mm is None:
+            return [], sequence
+
+        first = max(since, sequence - self.capacity)
+        if limit is not None:
+            first = max(first, sequence - limit)
+
+        records = \
+        [
+            unpack_point(self.mm, ring_offset + (index % self.capacity) * point_frame.size)
+            for index in range(first, sequence)
+        ]
+
+        # Records the writer lapped (or is writing) while they were read are dropped
+        lapped = self.sequence + 1 - self.capacity - first
+        return (records[lapped:] if lapped > 0 else records), sequence
+
+    def latest(self):
+        '''
+            Return (point, sent_ns) of the newest fix, or None
+        '''
+        records, _ = self.read(limit = 1)
+        return records[-1] if records else None
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
@@ -30,3 +30,20 @@ class Saver:
 
         except Exception as e:
             print('[SAVER]', f'Storage error: {e}')
+
+    def bulk_save(self, entries):
+        '''
+            Insert many {key: value} entries with a single write to disk
+        '''
+        try:
+            if isinstance(self.storage, dict):
+                self.storage.update(entries)
+                print('[SAVER]', f'{len(entries)} entries inserted into the in-memory dict storage')
+            else:
+                for key, value in entries.items():
+                    self.storage.store_put(key, value if isinstance(value, dict) else {'value': value})
+                self.storage.store_sync()  # One write for the whole batch
+                print('[SAVER]', f'{len(entries)} entries inserted into the storage')
+
+        except Exception as e:
+            print('[SAVER]', f'Storage error: {e}')
@@ -0,0 +1,107 @@
+import os
+import time
+import socket
+import select
+
+from kivy.storage.jsonstore import JsonStore
+
+from config import FPS, settings_socket_ext
+
+
+class SettingsChannel:
+    '''
+        Push channel for settings changes between the UI and the GNSS service.
+
+        The service binds a UNIX datagram socket next to settings.json and
+        sleeps in `wait` until the UI sends a notification (or the timeout
+        passes). Where the socket can't be bound (no AF_UNIX, no writable path)
+        `wait` falls back to sleeping one polling period.
+    '''
+    message = b'settings'
+
+    def __init__(self, settings_path):
+        self.path = None if settings_path is None else f'{settings_path}{settings_socket_ext}'
+        self.sock = None
+
+    @property
+    def listening(self):
+        return self.sock is not None
+
+    def listen(self):
+        '''
+            Bind the receiving socket, return False when only polling is possible
+        '''
+        if self.path is None:
+            print('[CHANNEL]', f'No settings file, polling at {FPS} Hz')
+            return False
+
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)  # left by a killed service
+
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(self.path)
+            sock.setblocking(False)
+            self.sock = sock
+            print('[CHANNEL]', f'Listening for settings changes on: {self.path}')
+            return True
+
+        except Exception as e:
+            print('[CHANNEL]', f'Settings socket unavailable, polling at {FPS} Hz: {e}')
+            return False
+
+    def wait(self, timeout):
+        '''
+            Sleep until notified (True) or until `timeout` / one polling period passes (False)
+        '''
+        if self.sock is None:
+            time.sleep(1 / FPS)
+            return False
+
+        readable = select.select([self.sock], [], [], timeout)[0]
+        if not readable:
+            return False
+
+        # Coalesce a burst of notifications into one wakeup
+        try:
+            while self.sock.recv(64):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def notify(self):
+        '''
+            Wake the listening service, silently ignored if no service listens
+        '''
+        if self.path is None:
+            return
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+                sock.sendto(self.message, self.path)
+        except (AttributeError, OSError):
+            pass  # no AF_UNIX, service not running or its queue is full
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+class SettingsStore(JsonStore):
+    '''
+        Settings JsonStore that notifies the GNSS service after every write to disk.
+    '''
+    def __init__(self, filename, **kwargs):
+        self.channel = SettingsChannel(filename)
+        super().__init__(filename, **kwargs)
+
+    def store_sync(self):
+        changed = self._is_changed
+        super().store_sync()
+        if changed:
+            self.channel.notify()
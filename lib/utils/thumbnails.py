@@ -0,0 +1,87 @@
+import os
+import glob
+import mmap
+import struct
+import tempfile
+
+from array import array
+
+from lib.gpx.track import Track
+
+
+# Header: magic, track mtime (ns), track size (B), point count, lat/lon origin
+thumbnail_header = struct.Struct('<4sqqIdd')
+thumbnail_magic  = b'THB1'
+thumbnail_ext    = '.thumb'
+
+
+def thumbnail_path(folder, track):
+    return os.path.join(folder, f'{track}{thumbnail_ext}')
+
+
+def track_fingerprint(track_path):
+    '''
+        Return (mtime_ns, size) identifying the current track file contents
+    '''
+    stat = os.stat(track_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def save_thumbnail(track_path, cache_path, track):
+    '''
+        Write the thumbnail as packed float32 (lat, lon) offsets from the track origin.
+
+        The cache is keyed by the track file mtime and size stored in the header,
+        so a rewritten track invalidates its thumbnail.
+    '''
+    mtime_ns, size = track_fingerprint(track_path)
+    bounds         = track.bounds()
+    min_lat, min_lon = (bounds[0], bounds[1]) if bounds else (0.0, 0.0)
+
+    # Offsets keep float32 precise at any latitude/longitude
+    points = array('f')
+    for lat, lon in zip(track.data['lat'], track.data['lon']):
+        if lat == lat and lon == lon:
+            points.append(lat - min_lat)
+            points.append(lon - min_lon)
+
+    # Unique temp per writer (outside the cache_path* glob of remove_thumbnail), a superseded job may still be writing
+    folder, name   = os.path.split(cache_path)
+    fd, cache_temp = tempfile.mkstemp(suffix = '.tmp', prefix = f'.{name}.', dir = folder)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(thumbnail_header.pack(thumbnail_magic, mtime_ns, size, len(points) // 2, min_lat, min_lon))
+            f.write(points.tobytes())
+        os.replace(cache_temp, cache_path)
+
+    except BaseException:
+        os.remove(cache_temp)
+        raise
+
+
+def load_thumbnail(track_path, cache_path):
+    '''
+        Memory-map a cached thumbnail, return a Track or None when missing or stale
+    '''
+    try:
+        with open(cache_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ) as mm:
+            magic, mtime_ns, size, count, min_lat, min_lon = thumbnail_header.unpack_from(mm)
+            if magic != thumbnail_magic or (mtime_ns, size) != track_fingerprint(track_path):
+                return None
+
+            with memoryview(mm)[thumbnail_header.size:thumbnail_header.size + count * 8].cast('f') as points:
+                lats = [min_lat + lat for lat in points[0::2]]
+                lons = [min_lon + lon for lon in points[1::2]]
+
+        return Track(('lat', 'lon'), {'lat': lats, 'lon': lons})
+
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def remove_thumbnail(cache_path):
+    '''
+        Remove the cache and every texture rendered from it
+    '''
+    for path in glob.glob(f'{glob.escape(cache_path)}*'):
+        os.remove(path)
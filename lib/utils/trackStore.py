@@ -0,0 +1,118 @@
+import os
+import json
+import sqlite3
+
+from kivy.storage import AbstractStore
+
+
+class TrackStore(AbstractStore):
+    '''
+        SQLite catalogue of the indexed tracks, a drop-in for the JsonStore it replaces.
+
+        One row per track: the full stats entry as JSON plus the mtime, format
+        and units columns, indexed for sorted / filtered queries. The database
+        runs in WAL mode, so a put or delete is a single row write instead of a
+        rewrite of the whole catalogue. `put`/`delete` commit immediately,
+        `store_put` + `store_sync` batch many rows into one transaction.
+    '''
+    columns = ('mtime', 'format', 'units')
+
+    def __init__(self, filename, **kwargs):
+        self.filename = filename
+        super().__init__(**kwargs)
+
+    def store_load(self):
+        self.db = sqlite3.connect(self.filename)
+        self.db.execute('PRAGMA journal_mode = WAL')
+        self.db.execute('PRAGMA synchronous = NORMAL')
+        self.db.executescript \
+        (
+            '''
+            CREATE TABLE IF NOT EXISTS tracks
+            (
+                name   TEXT PRIMARY KEY,
+                mtime  REAL,
+                format TEXT,
+                units  TEXT,
+                data   TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS tracks_mtime  ON tracks (mtime);
+            CREATE INDEX IF NOT EXISTS tracks_format ON tracks (format, mtime);
+            CREATE INDEX IF NOT EXISTS tracks_units  ON tracks (units, mtime);
+            '''
+        )
+
+    def store_sync(self):
+        self.db.commit()
+
+    def store_exists(self, key):
+        return self.db.execute('SELECT 1 FROM tracks WHERE name = ?', (key,)).fetchone() is not None
+
+    def store_get(self, key):
+        row = self.db.execute('SELECT data FROM tracks WHERE name = ?', (key,)).fetchone()
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def store_put(self, key, value):
+        self.db.execute \
+        (
+            'INSERT OR REPLACE INTO tracks (name, mtime, format, units, data) VALUES (?, ?, ?, ?, ?)',
+            (key, *(value.get(column, {}).get('value') for column in self.columns), json.dumps(value))
+        )
+        return True
+
+    def store_delete(self, key):
+        if self.db.execute('DELETE FROM tracks WHERE name = ?', (key,)).rowcount == 0:
+            raise KeyError(key)
+        return True
+
+    def store_find(self, filters):
+        for key, value in self.query(descending = False):
+            if all(value.get(k) == v for k, v in filters.items()):
+                yield key, value
+
+    def store_count(self):
+        return self.db.execute('SELECT COUNT(*) FROM tracks').fetchone()[0]
+
+    def store_keys(self):
+        return [row[0] for row in self.db.execute('SELECT name FROM tracks')]
+
+    def store_clear(self):
+        self.db.execute('DELETE FROM tracks')
+        return True
+
+    def query(self, order = 'mtime', descending = True, limit = -1, offset = 0, **filters):
+        '''
+            Return [(name, stats)] sorted by `order` (mtime, format, units or name),
+            one page of `limit` rows from `offset`, filtered by column values
+            (e.g. format = 'gpx')
+        '''
+        if order not in self.columns + ('name',):
+            raise ValueError(f'[CATALOGUE] Unknown order column {order!r}.')
+        for column in filters:
+            if column not in self.columns:
+                raise ValueError(f'[CATALOGUE] Unknown filter column {column!r}.')
+
+        where = ' AND '.join(f'{column} = ?' for column in filters)
+        sql   = \
+        (
+            f'SELECT name, data FROM tracks {"WHERE " + where if where else ""} '
+            f'ORDER BY {order} {"DESC" if descending else "ASC"}, name LIMIT ? OFFSET ?'
+        )
+        rows  = self.db.execute(sql, (*filters.values(), limit, offset))
+        return [(name, json.loads(data)) for name, data in rows]
+
+    def migrate_json(self, path):
+        '''
+            Import a legacy track_stats.json in one transaction, then remove it
+        '''
+        with open(path, 'r', encoding = 'utf-8') as f:
+            entries = json.load(f)
+
+        for key, value in entries.items():
+            self.store_put(key, value)
+        self.store_sync()
+
+        os.remove(path)
+        print('[CATALOGUE]', f'{len(entries)} tracks migrated from {path}')
@@ -1,5 +1,7 @@
+import time
+
 from config import default_settings
-from datetime           import datetime, timezone
+from datetime           import datetime, timezone, timedelta
 
 
 def dd_to_dms(decimal_degrees):
@@ -233,16 +235,155 @@ def units_to_gpx_distance(units, distance = None, threshold = False):
     return distance_unit
 
 
-def utc_ms_to_gpx_time(time_ms_utc, format = '%Y-%m-%dT%H:%M:%SZ'):
-    dt = datetime.fromtimestamp(time_ms_utc / 1000, tz = timezone.utc)
-    return dt.strftime(format)
+# Single-entry caches, consecutive fixes share the day and the minute
+gpx_day_cache    = (None, '')  # (days since epoch, 'YYYY-MM-DDT')
+gpx_minute_cache = (None, '')  # (minutes since epoch, 'YYYY-MM-DDTHH:MM:')
+gpx_parse_cache  = ('', 0)     # ('YYYY-MM-DDTHH:MM:', ms since epoch)
+
+two_digits       = tuple(f'{i:02d}' for i in range(100))
+two_digit_values = {text: i for i, text in enumerate(two_digits)}  # '00'..'99' only, None for anything else
+days_in_month    = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def civil_from_days(days):
+    '''
+        Convert days since 1970-01-01 to a proleptic Gregorian date (H. Hinnant's algorithm).
+
+        Args:
+            days (int): Days since the Unix epoch
+
+        Returns:
+            tuple: (year, month, day)
+    '''
+    days += 719468
+    era   = days // 146097
+    doe   = days - era * 146097
+    yoe   = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy   = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp    = (5 * doy + 2) // 153
+    day   = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+def days_from_civil(year, month, day):
+    '''
+        Convert a proleptic Gregorian date to days since 1970-01-01 (inverse of civil_from_days).
+
+        Args:
+            year (int): Year
+            month (int): Month (1-12)
+            day (int): Day of month (1-31)
+
+        Returns:
+            int: Days since the Unix epoch
+    '''
+    year -= month <= 2
+    era   = year // 400
+    yoe   = year - era * 400
+    doy   = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    doe   = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+def utc_ms_to_gpx_time(time_ms_utc, milliseconds = False):
+    '''
+        Format UTC milliseconds as ISO-8601 'YYYY-MM-DDTHH:MM:SSZ', or '...SS.sssZ' with milliseconds.
+        The date text is cached per day and the date + time text per minute.
+    '''
+    global gpx_day_cache, gpx_minute_cache
+
+    seconds, ms   = divmod(int(time_ms_utc), 1000)
+    minutes, secs = divmod(seconds, 60)
+
+    minute = gpx_minute_cache
+    if minute[0] != minutes:
+        days, rest = divmod(minutes, 1440)
+
+        day = gpx_day_cache
+        if day[0] != days:
+            year, month, day_ = civil_from_days(days)
+            day = gpx_day_cache = (days, f'{year:04d}-{month:02d}-{day_:02d}T')
+
+        minute = gpx_minute_cache = (minutes, f'{day[1]}{two_digits[rest // 60]}:{two_digits[rest % 60]}:')
+
+    if milliseconds:
+        return f'{minute[1]}{two_digits[secs]}.{ms:03d}Z'
+    return minute[1] + two_digits[secs] + 'Z'
+
+def gpx_minute_to_utc_ms(prefix):
+    '''
+        Parse the 'YYYY-MM-DDTHH:MM:' prefix of a GPX time to UTC milliseconds.
+
+        Returns:
+            int: Milliseconds since the epoch, None if a field is not all digits or out of range
+    '''
+    year = prefix[:4]
+    month, day, hour, minute = (two_digit_values.get(prefix[i:i + 2]) for i in (5, 8, 11, 14))
+
+    if prefix[4] + prefix[7] + prefix[10] + prefix[13] + prefix[16] != '--T::' or not (year.isascii() and year.isdigit()):
+        return None
+    if None in (month, day, hour, minute) or not 1 <= month <= 12 or hour > 23 or minute > 59:
+        return None
+
+    year = int(year)
+    leap = month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+    if not 1 <= day <= days_in_month[month - 1] + leap:
+        return None
+
+    return days_from_civil(year, month, day) * 86400000 + hour * 3600000 + minute * 60000
+
+def gpx_time_to_utc_ms(dt_str):
+    '''
+        Parse an ISO-8601 UTC time ('YYYY-MM-DDTHH:MM:SSZ', optional fraction) to UTC milliseconds.
+        Fixed positions are checked and sliced as integers, cached up to the minute; a 'Z' time
+        that fails the fast path goes through datetime.strptime, other ISO-8601 forms (offsets,
+        no 'Z') through datetime.fromisoformat, naive times taken as UTC. Malformed times raise ValueError.
+    '''
+    global gpx_parse_cache
+
+    if len(dt_str) >= 20 and dt_str[-1] == 'Z':
+        prefix = dt_str[:17]
+
+        minute = gpx_parse_cache
+        if minute[0] != prefix:
+            time_ms = gpx_minute_to_utc_ms(prefix)
+            if time_ms is not None:
+                minute = gpx_parse_cache = (prefix, time_ms)
 
-def gpx_time_to_utc_ms(dt_str, format = '%Y-%m-%dT%H:%M:%SZ'):
-    # Parse and convert to datetime object in UTC
-    dt = datetime.strptime(dt_str, format).replace(tzinfo = timezone.utc)
+        second = two_digit_values.get(dt_str[17:19])
+        if minute[0] == prefix and second is not None and second < 61:  # 60 is a leap second
+            time_ms = minute[1] + second * 1000
 
-    # Convert to Unix timestamp (seconds) and then to milliseconds
+            if len(dt_str) == 20:
+                return time_ms
+
+            fraction = dt_str[20:-1]
+            if dt_str[19] == '.' and fraction.isascii() and fraction.isdigit():
+                return time_ms + int(fraction[:3].ljust(3, '0'))  # truncated to ms
+
+        # Not the fixed layout, strptime validates every field
+        dt = datetime.strptime(dt_str, '%Y-%m-%dT%H:%M:%S.%fZ' if '.' in dt_str else '%Y-%m-%dT%H:%M:%SZ')
+        return (dt - datetime(1970, 1, 1)) // timedelta(milliseconds = 1)
+
+    dt = datetime.fromisoformat(dt_str)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo = timezone.utc)
     return int(dt.timestamp() * 1000)
 
 def utc_ms_time():
-    return int(datetime.now(tz = timezone.utc).timestamp() * 1000)
+    return time.time_ns() // 1_000_000
+
+def parse_number(value, cast = float):
+    '''
+        Convert a recorded field to a number, blank or missing fields become None.
+
+        Args:
+            value (str): Field text as written by the recorders
+            cast (type): Target type (float or int)
+
+        Returns:
+            float | int | None
+    '''
+    if value is None:
+        return None
+
+    value = value.strip()
+    return cast(value) if value else None
@@ -0,0 +1,45 @@
+package org.prod.simplegpslogger;
+
+import android.location.Location;
+import android.os.Bundle;
+
+import java.util.List;
+
+/**
+ * Packs Location fixes into a flat double[] so Python reads a fix with one
+ * JNI call instead of one per getter. Layout per fix (FIELDS values):
+ * latitude, longitude, altitude, time (ms UTC), speed, accuracy, bearing,
+ * satellites; NaN where the fix has no such value.
+ */
+public final class LocationPacker {
+    public static final int FIELDS = 8;
+
+    private LocationPacker() {}
+
+    public static double[] pack(Location loc) {
+        double[] out = new double[FIELDS];
+        packInto(loc, out, 0);
+        return out;
+    }
+
+    public static double[] packList(List<Location> locations) {
+        double[] out = new double[locations.size() * FIELDS];
+        for (int i = 0; i < locations.size(); i++) {
+            packInto(locations.get(i), out, i * FIELDS);
+        }
+        return out;
+    }
+
+    private static void packInto(Location loc, double[] out, int offset) {
+        Bundle extras = loc.getExtras();
+
+        out[offset]     = loc.getLatitude();
+        out[offset + 1] = loc.getLongitude();
+        out[offset + 2] = loc.hasAltitude() ? loc.getAltitude() : Double.NaN;
+        out[offset + 3] = (double) loc.getTime();  // exact below 2^53 ms
+        out[offset + 4] = loc.hasSpeed()    ? loc.getSpeed()    : Double.NaN;
+        out[offset + 5] = loc.hasAccuracy() ? loc.getAccuracy() : Double.NaN;
+        out[offset + 6] = loc.hasBearing()  ? loc.getBearing()  : Double.NaN;
+        out[offset + 7] = extras != null && extras.containsKey("satellites") ? extras.getInt("satellites") : Double.NaN;
+    }
+}
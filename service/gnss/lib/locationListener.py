@@ -5,7 +5,7 @@ from service.gnss.lib.locationSender import LocationSender
 
 
 if platform == 'android':
-    from service.gnss.lib.utils.point import gnss_transformer
+    from service.gnss.lib.utils.point import gnss_transformer, gnss_transformer_list
 
     class LocationListener(PythonJavaClass, LocationSender):
         '''
@@ -34,13 +34,13 @@ if platform == 'android':
         @java_method('(Ljava/util/List;)V', name = 'onLocationChanged')
         def onLocationChangedList(self, location_list):
             '''
-                Callback for batch location updates (API 31+).
+                Callback for batch location updates (API 31+), oldest fix first.
+                Every fix is recorded, only the newest is published to the display.
             '''
             try:
-                # Get the most recent location from the list
-                if location_list and location_list.size() > 0:
-                    location = location_list.get(location_list.size() - 1)
-                    self.onLocationChanged(location)
+                points = gnss_transformer_list(location_list) if location_list else []
+                if points:
+                    self.listen_points(points)
                 else:
                     print(f'[GNSS] Empty location list received')
 
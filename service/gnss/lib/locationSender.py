@@ -1,5 +1,10 @@
-import json
-from lib.utils.paths import load_path, tracks_folder, gnss_log
+import time
+
+from config import default_settings, delivery_report
+
+from lib.utils.paths        import load_path, tracks_folder, gnss_socket, gnss_ring
+from lib.utils.pointChannel import PointChannel
+from lib.utils.pointRing    import PointRing
 
 from lib.gpx.csvRecorder  import CSVRecorder
 from lib.gpx.gpxRecorder  import GPXRecorder
@@ -12,20 +17,24 @@ class LocationSender:
 
         # Settings init
         self.folder   = load_path(tracks_folder)
-        self.gnss_log = load_path(gnss_log, path_only = True)
+        self.channel  = PointChannel(load_path(gnss_socket, path_only = True))
+        self.ring     = PointRing(load_path(gnss_ring, path_only = True), writer = True)
 
         # Last init
         self.point_last = None
 
+        # Deliveries init (deliveries = listener callbacks, fixes = points they carried)
+        self.deliveries_reset()
+
         # States init
         self.is_recording = 0
 
-    def gnss_recorder(self, point):
+    def gnss_recorder(self, points):
         try:
             if self.is_recording == 1:
                 self.recorder.start_recording()
                 self.recorder.resume_recording()
-                self.recorder.add_point(point)
+                self.recorder.add_points(points)
 
             elif self.is_recording == -1:
                 self.recorder.pause_recording()
@@ -36,28 +45,79 @@ class LocationSender:
         except Exception as e:
             print('[GNSS]', f'Recorder: {e}')
 
-    def gnss_sender(self, point):
+    def recorder_commit(self):
+        '''
+            Commit points still pending in the recorder writer
+        '''
+        try:
+            writer = getattr(self.recorder, 'temp_points_file', None)
+            if writer is not None and not writer.closed:
+                writer.commit()
+
+        except Exception as e:
+            print('[GNSS]', f'Recorder commit: {e}')
+
+    def gnss_sender(self, points):
         try:
-            with open(self.gnss_log, 'w', encoding = 'utf-8') as f:
-                json.dump(point, f, indent = 2)
+            # Every fix goes to the shared ring history, only the newest to the display
+            sent_ns = time.time_ns()
+            for point in points:
+                self.ring.append(point, sent_ns)
+            self.channel.send(points[-1])
 
         except Exception as e:
             print('[GNSS]', f'Sender: {e}')
 
     def listen(self, point):
+        self.listen_points([point])
+
+    def listen_points(self, points):
+        '''
+            Handle a batch of fixes in delivery order (single fixes are a batch of one)
+        '''
+        self.deliveries += 1
+        self.fixes      += len(points)
+
+        # Reported from the callback, the service loop may sleep until a settings push
+        if delivery_report and time.monotonic() - self.deliveries_since >= delivery_report:
+            self.deliveries_report()
+
         # Point check
-        if point and point != self.point_last:
-            # Record point
-            self.gnss_recorder(point)
-            # Send point
-            self.gnss_sender(point)
+        fresh = []
+        for point in points:
+            if point and point != self.point_last:
+                fresh.append(point)
+            self.point_last = point
+
+        if fresh:
+            # Record points
+            self.gnss_recorder(fresh)
+            # Send points
+            self.gnss_sender(fresh)
+
+    def deliveries_reset(self):
+        self.deliveries       = 0
+        self.fixes            = 0
+        self.deliveries_since = time.monotonic()
 
-        self.point_last = point
+    def deliveries_report(self):
+        '''
+            Log location deliveries (listener callbacks) and fixes per hour since the last report
+        '''
+        hours = (time.monotonic() - self.deliveries_since) / 3600
+        if hours > 0:
+            print \
+            (
+                '[GNSS]',
+                f'Deliveries: {self.deliveries / hours:.0f} deliveries/h, {self.fixes / hours:.0f} fixes/h '
+                f'({self.fixes / max(self.deliveries, 1):.1f} fixes per delivery)'
+            )
+        self.deliveries_reset()
 
-    def settings_recorder(self, format, units, output_file = None):
+    def settings_recorder(self, format, units, precision = default_settings['precision']['value'], output_file = None):
         if format == 'GPX 1.1':
-            self.recorder = GPXRecorder1(output_file = output_file, work_path = self.folder, units = units)
+            self.recorder = GPXRecorder1(output_file = output_file, work_path = self.folder, units = units, precision = precision)
         elif format == 'CSV':
-            self.recorder = CSVRecorder(output_file = output_file, work_path = self.folder, units = units)
+            self.recorder = CSVRecorder(output_file = output_file, work_path = self.folder, units = units, precision = precision)
         else:
-            self.recorder = GPXRecorder(output_file = output_file, work_path = self.folder, units = units)
+            self.recorder = GPXRecorder(output_file = output_file, work_path = self.folder, units = units, precision = precision)
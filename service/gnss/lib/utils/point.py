@@ -1,3 +1,27 @@
+from kivy import platform
+
+LocationPacker = None
+if platform == 'android':
+    try:
+        from jnius import autoclass
+        # Java helper compiled into the APK (android.add_src), one JNI call per fix
+        LocationPacker = autoclass('org.prod.simplegpslogger.LocationPacker')
+    except Exception as e:
+        print(f'[GNSS] LocationPacker not available, using getters: {e}')
+
+
+# LocationPacker layout, NaN where the fix has no value
+packed_fields = \
+(
+    'latitude',
+    'longitude',
+    'altitude_m',
+    'time_ms_utc',
+    'speed_mps',
+    'accuracy_m',
+    'bearing_deg',
+    'satellites_used_in_fix'
+)
 
 def get_sattelites(loc):
     # Get satellite count from extras Bundle (GPS_PROVIDER includes this)
@@ -24,7 +48,34 @@ def get_safe(value, cast = float, check = None, fallback = None):
         print(f"[GNSS] Failed to get location update: {e}")
         return fallback
 
-def gnss_transformer(loc, last = False):
+def packed_points(values, provider):
+    '''
+        Build points from a LocationPacker array (one or more fixes)
+    '''
+    fields = len(packed_fields)
+    points = []
+    for offset in range(0, len(values), fields):
+        latitude, longitude, altitude, time_ms, speed, accuracy, bearing, satellites = values[offset:offset + fields]
+        points.append \
+        (
+            {
+                'latitude':               latitude,
+                'longitude':              longitude,
+                'altitude_m':             None if altitude   != altitude   else altitude,
+                'time_ms_utc':            int(time_ms),
+                'speed_mps':              None if speed      != speed      else speed,
+                'accuracy_m':             None if accuracy   != accuracy   else accuracy,
+                'bearing_deg':            None if bearing    != bearing    else bearing,
+                'satellites_used_in_fix': None if satellites != satellites else int(satellites),
+                'provider':               provider
+            }
+        )
+    return points
+
+def gnss_getters(loc, last = False):
+    '''
+        One JNI call per getter, used when the helper class is missing
+    '''
     point = \
     {
         'latitude':                     get_safe(loc.getLatitude(),   float),
@@ -32,9 +83,31 @@ def gnss_transformer(loc, last = False):
         'altitude_m':                   get_safe(loc.getAltitude(),   float, loc.hasAltitude()),
         'time_ms_utc':                  get_safe(loc.getTime(),       int),
         'speed_mps':                    get_safe(loc.getSpeed(),      float, loc.hasSpeed()),
-        'accuracy_m':                   get_safe(loc.getSpeed(),      float, loc.hasSpeed()),
-        'bearing_deg':                  get_safe(loc.getAccuracy(),   float, loc.hasAccuracy()),
+        'accuracy_m':                   get_safe(loc.getAccuracy(),   float, loc.hasAccuracy()),
+        'bearing_deg':                  get_safe(loc.getBearing(),    float, loc.hasBearing()),
         'satellites_used_in_fix':       get_safe(get_sattelites(loc), int),
         'provider': 'last' if last else get_safe(loc.getProvider(),   str)
     }
     return point
+
+def gnss_transformer(loc, last = False):
+    if LocationPacker is None:
+        return gnss_getters(loc, last)
+
+    provider = 'last' if last else loc.getProvider()
+    return packed_points(LocationPacker.pack(loc), provider)[0]
+
+def gnss_transformer_list(location_list):
+    '''
+        Points of a batched delivery (java.util.List, oldest first).
+        All fixes of one request come from the same provider, read from the newest.
+    '''
+    if LocationPacker is None:
+        return [gnss_getters(loc) for loc in location_list.toArray()]
+
+    size = location_list.size()
+    if size == 0:
+        return []
+
+    provider = location_list.get(size - 1).getProvider()
+    return packed_points(LocationPacker.packList(location_list), provider)
@@ -1,13 +1,13 @@
 import os
-import time
 import json
 
 from jnius  import autoclass, cast
 from kivy   import platform
-from config import FPS
+from config import FPS, params, default_settings, settings_timeout
 
-from lib.utils.paths import load_path, settings_json
-from lib.utils.saver import Saver
+from lib.utils.paths           import load_path, settings_json
+from lib.utils.saver           import Saver
+from lib.utils.settingsChannel import SettingsChannel
 from lib.utils.units import utc_ms_time, utc_ms_to_gpx_time
 
 from service.gnss.lib.locationListener import LocationListener
@@ -39,6 +39,7 @@ if platform == 'android':
             # Last init
             self.format_last       = None
             self.units_last        = None
+            self.precision_last    = None
             self.is_recording_last = None
             self.mtime_last        = None
 
@@ -49,8 +50,12 @@ if platform == 'android':
             self.interval_ms      = None
             self.interval_ms_last = None
 
+            self.batching_ms      = 0
+            self.batching_ms_last = 0
+
             # Settings init
             self.settings = load_path(settings_json, path_only = True)
+            self.channel  = SettingsChannel(None if isinstance(self.settings, dict) else self.settings)
             self.settings_watcher()
 
             self.executor = None
@@ -59,7 +64,10 @@ if platform == 'android':
             self.ht = None  # handler thread
             self.lm = None  # location manager
 
-        def settings_watcher(self):
+        def settings_watcher(self, notified = False):
+            '''
+                Apply settings.json if notified through the channel or its mtime changed
+            '''
             try:
                 if isinstance(self.settings, dict):
                     # Use default settings
@@ -67,7 +75,7 @@ if platform == 'android':
 
                 else:
                     mtime = os.path.getmtime(self.settings)
-                    if mtime != self.mtime_last:
+                    if notified or mtime != self.mtime_last:
                         with open(self.settings, 'r', encoding = 'utf-8') as f:
                             # Apply settings changes
                             content = json.load(f)  # Single JSON object
@@ -82,26 +90,29 @@ if platform == 'android':
             is_recording = settings['is_recording']['value']
             format       = settings['format']['value']
             units        = settings['units']['value']
+            precision    = settings.get('precision', default_settings['precision'])['value']
 
             self.interval_ms = settings['interval']['value'] * 1000  # Convert seconds to milliseconds
             self.distance_m  = settings['distance']['value']
+            self.batching_ms = params['batching'].get(settings.get('batching', {}).get('value'), 0) * 1000
 
             # Recording state check
             if self.is_recording_last != is_recording:
                 self.locationListener.is_recording = is_recording
 
             # Settings check
-            if self.format_last != format or self.units_last != units:
-                self.locationListener.settings_recorder(format = format, units = units)
+            if self.format_last != format or self.units_last != units or self.precision_last != precision:
+                self.locationListener.settings_recorder(format = format, units = units, precision = precision)
 
             # Service check (only restart if values actually changed)
-            if self.interval_ms_last != self.interval_ms or self.distance_m_last != self.distance_m:
+            if self.interval_ms_last != self.interval_ms or self.distance_m_last != self.distance_m or self.batching_ms_last != self.batching_ms:
                 self.settings_service()
 
             self.is_recording_last = is_recording
 
-            self.format_last = format
-            self.units_last  = units
+            self.format_last    = format
+            self.units_last     = units
+            self.precision_last = precision
 
         def settings_service(self):
             '''
@@ -117,6 +128,11 @@ if platform == 'android':
 
                 if self.distance_m_last != self.distance_m:
                     print('[GNSS]', f'Distance changed: {self.distance_m_last} -> {self.distance_m} m')
+
+                if self.batching_ms_last != self.batching_ms:
+                    print('[GNSS]', f'Batching changed: {self.batching_ms_last} -> {self.batching_ms} ms')
+
+                self.wake_lock_update()
             else:
                 # Service not running yet - just log that parameters are ready
                 print('[GNSS]', f'Parameters updated (service not running): interval = {self.interval_ms} ms, distance = {self.distance_m}  m')
@@ -124,6 +140,27 @@ if platform == 'android':
             # Always update tracking variables after change
             self.interval_ms_last = self.interval_ms
             self.distance_m_last  = self.distance_m
+            self.batching_ms_last = self.batching_ms
+
+        def batching_active(self):
+            '''
+                Fixes are batched by the GNSS chip (LocationRequest path of request_updates)
+            '''
+            return int(Build_VERSION.SDK_INT) >= 31 and self.batching_ms > self.interval_ms
+
+        def wake_lock_update(self):
+            '''
+                Hold the wake lock only without batching. With batching each delivery wakes
+                the CPU by itself and the loop sleeps until a settings push, so the CPU can
+                suspend between batches.
+            '''
+            if self.batching_active():
+                if self.wake_lock is not None:
+                    release_wake_lock(self.wake_lock)
+                    self.wake_lock = None
+
+            elif self.wake_lock is None:
+                self.wake_lock = acquire_wake_lock()
 
         def ensure_thread(self):
             SDK_INT = int(Build_VERSION.SDK_INT)
@@ -181,12 +218,33 @@ if platform == 'android':
                 Request location updates in a version-safe way:
                 - For API < 30, use the Looper-based overload.
                 - For API >= 30, use the Executor-based overload.
+                - For API >= 31 with batching on, use a LocationRequest whose max. update
+                  delay lets the GNSS chip buffer fixes and wake the service once per batch.
             '''
             try:
                 SDK_INT = int(Build_VERSION.SDK_INT)
                 print('[GNSS]', f'Android SDK version: {SDK_INT}')
 
-                if SDK_INT >= 30:
+                if SDK_INT >= 31 and self.batching_ms > interval_ms:
+                    LocationRequest = autoclass('android.location.LocationRequest')
+                    Builder         = autoclass('android.location.LocationRequest$Builder')
+                    builder         = Builder(int(interval_ms))
+                    builder.setMinUpdateDistanceMeters(float(distance_m))
+                    builder.setMaxUpdateDelayMillis(int(self.batching_ms))
+                    builder.setQuality(LocationRequest.QUALITY_HIGH_ACCURACY)
+                    request         = builder.build()
+
+                    # Batches arrive through onLocationChanged(List)
+                    self.lm.requestLocationUpdates \
+                    (
+                        LocationManager.GPS_PROVIDER,
+                        request,
+                        self.executor,
+                        self.locationListener
+                    )
+                    print('[GNSS]', f'Started GPS listener using LocationRequest (interval = {interval_ms} ms, distance = {distance_m} m, batching = {self.batching_ms} ms)')
+
+                elif SDK_INT >= 30:
                     # Use the new API 30+ overload
                     self.lm.requestLocationUpdates \
                     (
@@ -249,7 +307,10 @@ if platform == 'android':
 
         def stop_service(self):
             self.stop_updates()
+            self.locationListener.recorder_commit()
+            self.channel.close()
             release_wake_lock(self.wake_lock)
+            self.wake_lock  = None
             self.is_running = False
             print('[GNSS]', 'Service stopped')
 
@@ -263,10 +324,13 @@ if platform == 'android':
                 notif = create_notification()
                 promote_to_foreground(notif)
 
-                self.wake_lock = acquire_wake_lock()
-
                 self.start_updates(self.interval_ms, self.distance_m)
                 self.is_running = True
+                self.wake_lock_update()
+
+                # Settings pushed by the app, polling only if the channel is unavailable
+                self.channel.listen()
+                self.settings_watcher()
 
                 heartbeat_last = utc_ms_time()
 
@@ -280,11 +344,11 @@ if platform == 'android':
                         print('[GNSS]', f'Service heartbeat: {current_time_gpx}')
                         heartbeat_last = current_time
 
-                    # Watch for settings changes
-                    self.settings_watcher()
-
-                    # 10 FPS equivalent
-                    time.sleep(1 / FPS)
+                    # Sleep until the app pushes a settings change (heartbeat timeout, or FPS polling as fallback).
+                    # With batching there is no timeout: a timed wakeup would keep the CPU out of suspend
+                    timeout  = None if self.batching_active() else settings_timeout
+                    notified = self.channel.wait(timeout)
+                    self.settings_watcher(notified)
 
                 else:
                     self.stop_service()
@@ -318,6 +382,7 @@ else:
             # Last init
             self.format_last         = None
             self.units_last          = None
+            self.precision_last      = None
             self.interval_ms_last    = None
             self.mtime_states_last   = None
             self.mtime_settings_last = None
@@ -326,9 +391,13 @@ else:
 
             # Settings init
             self.settings = load_path(settings_json, path_only = True)
+            self.channel  = SettingsChannel(None if isinstance(self.settings, dict) else self.settings)
             self.settings_watcher()
 
-        def settings_watcher(self):
+        def settings_watcher(self, notified = False):
+            '''
+                Apply settings.json if notified through the channel or its mtime changed
+            '''
             try:
                 if isinstance(self.settings, dict):
                     # Use default settings
@@ -336,7 +405,7 @@ else:
 
                 else:
                     mtime = os.path.getmtime(self.settings)
-                    if mtime != self.mtime_settings_last:
+                    if notified or mtime != self.mtime_settings_last:
                         with open(self.settings, 'r', encoding = 'utf-8') as f:
                             # Apply settings changes
                             content = json.load(f)  # Single JSON object
@@ -351,13 +420,14 @@ else:
         def settings_updates(self, content):
             format       = content['format']['value']
             units        = content['units']['value']
+            precision    = content.get('precision', default_settings['precision'])['value']
             is_recording = content['is_recording']['value']
 
             self.interval_ms = content['interval']['value'] * 1000 # Convert seconds to milliseconds
 
             # Settings check
-            if self.format_last != format or self.units_last != units:
-                self.locationListener.settings_recorder(format = format, units = units)
+            if self.format_last != format or self.units_last != units or self.precision_last != precision:
+                self.locationListener.settings_recorder(format = format, units = units, precision = precision)
 
             # Recording state check
             if self.is_recording_last != is_recording:
@@ -369,6 +439,7 @@ else:
 
             self.format_last       = format
             self.units_last        = units
+            self.precision_last    = precision
             self.is_recording_last = is_recording
             self.interval_ms_last  = self.interval_ms
 
@@ -377,17 +448,21 @@ else:
             if not self.is_running:
                 self.locationListener.schedule(self.interval_ms)
                 self.is_running = True
+                self.channel.listen()
                 self.thread.start()
                 print('[GNSS]', f'Service started')
 
         def stop_updates(self):
             if self.is_running:
                 self.locationListener.unschedule()
+                self.locationListener.recorder_commit()
                 self.is_running = False
                 print('[GNSS]', f'Service stopped')
                 if self.thread:
+                    self.channel.notify()  # wake the loop so the join doesn't wait for the timeout
                     self.thread.join()
                     self.thread = None
+                self.channel.close()
 
         def settings_service(self):
             if self.is_running:
@@ -409,11 +484,9 @@ else:
                         print('[GNSS]', f'Service heartbeat: {current_time_gpx}')
                         heartbeat_last = current_time
 
-                    # Watch for settings changes
-                    self.settings_watcher()
-
-                    # 10 FPS equivalent
-                    time.sleep(1 / FPS)
+                    # Sleep until the app pushes a settings change (heartbeat timeout, or FPS polling as fallback)
+                    notified = self.channel.wait(settings_timeout)
+                    self.settings_watcher(notified)
 
                 else:
                     self.stop_updates()
@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from lib.gpx.csvRecorder     import CSVRecorder
+from lib.gpx.csv_stat_parser import parse_all_csv_statistics, parse_csv_dict
+
+
+def points(count):
+    for i in range(count):
+        yield \
+        {
+            'latitude':               48 + i * 1e-4,
+            'longitude':              17 + i % 7 * 1e-4,
+            'altitude_m':             100.0 + i % 5,
+            'time_ms_utc':            1_700_000_000_000 + i * 1000,
+            'speed_mps':              1.5,
+            'accuracy_m':             3.0,
+            'satellites_used_in_fix': 8
+        }
+
+
+def crashed_recording(folder, count):
+    recorder = CSVRecorder(output_file = 'Track.csv', work_path = folder)
+    recorder.start_recording()
+    for point in points(count):
+        recorder.add_point(point)
+    recorder.temp_points_file.commit()  # killed before stop_recording
+    return recorder.temp_file_path
+
+
+def reconstruct(folder):
+    CSVRecorder(output_file = 'Track.csv', work_path = folder).generate_final_file(True)
+    with open(os.path.join(folder, 'Track.csv'), encoding = 'utf-8') as f:
+        content = f.read()
+    return parse_all_csv_statistics(content), parse_csv_dict(content, reconstruct = True)
+
+
+def test_reconstruct_complete_temp_file(tmp_path):
+    crashed_recording(str(tmp_path), 120)
+
+    stats, track = reconstruct(str(tmp_path))
+    assert stats['track_points']['value'] == 120
+    assert len(track) == 120
+    assert track[-1]['time_ms_utc'] == 1_700_000_000_000 + 119 * 1000
+
+
+def row_cut(row, column, offset):
+    '''
+        Length of `row` kept when a crash cuts it `offset` bytes into `column` (0: lat)
+    '''
+    return len(b','.join(row.split(b',')[:column])) + (column > 0) + offset
+
+
+# Cuts inside lat, lon, ele and time, and right after a separator
+cuts = [(0, 3), (1, 0), (1, 2), (2, 3), (3, 8)]
+
+
+@pytest.mark.parametrize('column, offset', cuts)
+def test_reconstruct_skips_torn_final_row(tmp_path, column, offset):
+    temp_path = crashed_recording(str(tmp_path), 120)
+
+    # Tear the last recorded row, the checkpoint past the cut is ignored (full replay)
+    with open(temp_path, 'rb+') as f:
+        content = f.read()
+        row     = content.rstrip(b'\n').rfind(b'\n') + 1
+        f.truncate(row + row_cut(content[row:], column, offset))
+
+    stats, track = reconstruct(str(tmp_path))
+    assert stats['track_points']['value'] == 119
+    assert len(track) == 119
+    assert track[-1]['time_ms_utc'] == 1_700_000_000_000 + 118 * 1000
+
+
+@pytest.mark.parametrize('column, offset', cuts)
+def test_reconstruct_skips_torn_row_after_checkpoint(tmp_path, column, offset):
+    temp_path = crashed_recording(str(tmp_path), 120)
+
+    # A row torn after the last checkpoint, the only tail left to replay
+    with open(temp_path, 'rb+') as f:
+        content = f.read()
+        row     = content[content.rstrip(b'\n').rfind(b'\n') + 1:]
+        f.write(row[:row_cut(row, column, offset)])
+
+    stats, track = reconstruct(str(tmp_path))
+    assert stats['track_points']['value'] == 120
+    assert len(track) == 120
+    assert track[-1]['time_ms_utc'] == 1_700_000_000_000 + 119 * 1000
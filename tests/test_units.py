@@ -0,0 +1,81 @@
+import pytest
+
+from datetime import datetime
+
+from lib.utils.units import utc_ms_to_gpx_time, gpx_time_to_utc_ms
+
+
+def reference(dt_str):
+    return int(datetime.fromisoformat(dt_str.replace('Z', '+00:00')).timestamp() * 1000)
+
+
+@pytest.mark.parametrize \
+(
+    'dt_str',
+    [
+        '2026-10-18T12:34:56Z',
+        '2024-02-29T23:59:59Z',
+        '1969-12-31T23:59:59Z',
+        '2026-10-18T12:34:56.789Z',
+        '2026-10-18T12:34:56.5Z',
+    ]
+)
+def test_parse_matches_datetime(dt_str):
+    assert gpx_time_to_utc_ms(dt_str) == reference(dt_str)
+
+
+def test_parse_truncates_fraction_to_ms():
+    assert gpx_time_to_utc_ms('2026-10-18T12:34:56.123987Z') == reference('2026-10-18T12:34:56.123Z')
+
+
+def test_leap_second_rolls_into_next_minute():
+    assert gpx_time_to_utc_ms('2016-12-31T23:59:60Z') == reference('2017-01-01T00:00:00Z')
+
+
+def test_round_trip():
+    for time_ms in range(1_700_000_000_000, 1_700_000_000_000 + 200 * 61_003, 61_003):
+        assert gpx_time_to_utc_ms(utc_ms_to_gpx_time(time_ms, milliseconds = True)) == time_ms
+        assert gpx_time_to_utc_ms(utc_ms_to_gpx_time(time_ms)) == time_ms // 1000 * 1000
+
+
+@pytest.mark.parametrize \
+(
+    'dt_str',
+    [
+        '2026-02-30T12:00:00Z',  # day past the end of the month
+        '2025-02-29T12:00:00Z',  # not a leap year
+        '1900-02-29T12:00:00Z',  # century, not a leap year
+        '2026-13-01T12:00:00Z',
+        '2026-00-01T12:00:00Z',
+        '2026-01-00T12:00:00Z',
+        '2026-01-01T24:00:00Z',
+        '2026-01-01T12:60:00Z',
+        '2026-01-01T12:00:61Z',
+        '2026-02-30T25:61:99Z',
+        '2026-01-01T12:00: 5Z',  # space padded seconds
+        '2026-01-01T12: 0:05Z',
+        '2026-01-01T+1:00:05Z',
+        '20a6-01-01T12:00:05Z',
+        '2026/01/01T12:00:05Z',
+        '2026-01-01T12:00:05.Z',
+        '2026-01-01T12:00:05.1aZ',
+        '2026-01-01T12:00:05,1Z',
+    ]
+)
+def test_parse_rejects_malformed(dt_str):
+    with pytest.raises(ValueError):
+        gpx_time_to_utc_ms(dt_str)
+
+
+def test_rejection_after_cache_hit():
+    # Same minute prefix as a valid time already in the cache
+    assert gpx_time_to_utc_ms('2026-01-01T12:00:05Z') == reference('2026-01-01T12:00:05Z')
+    with pytest.raises(ValueError):
+        gpx_time_to_utc_ms('2026-01-01T12:00:99Z')
+    with pytest.raises(ValueError):
+        gpx_time_to_utc_ms('2026-01-01T12:00:-1Z')
+
+
+def test_offset_falls_back_to_fromisoformat():
+    assert gpx_time_to_utc_ms('2026-10-18T14:34:56+02:00') == reference('2026-10-18T12:34:56Z')
+    assert gpx_time_to_utc_ms('2026-10-18T12:34:56') == reference('2026-10-18T12:34:56Z')